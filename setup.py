@@ -8,7 +8,9 @@ setup(
     packages=find_packages(where="src"),
     package_dir={"": "src"},
     install_requires=[
-        # No external dependencies for core scanner to ensure portability
+        # No external dependencies for core scanner to ensure portability;
+        # tomli only backports tomllib for TOML rule packs
+        'tomli>=1.1; python_version<"3.11"',
     ],
     entry_points={
         "console_scripts": [
@@ -1,20 +1,15 @@
-import re
 import sys
 import os
 import argparse
 import json
-import math
-from typing import List, Dict, Any
-
-# Initial Default Configuration (Fallback)
-DEFAULT_CONFIG = {
-    "severity_actions": {
-        "HIGH": "BLOCK",
-        "MEDIUM": "WARN",
-        "LOW": "LOG"
-    },
-    "patterns": [] # Should be loaded from file
-}
+from typing import Optional
+
+# Shared with the security_guardian package (src/ is on sys.path when run as a script)
+from security_guardian.entropy import ENTROPY_THRESHOLD, shannon_entropy
+from security_guardian.models import Severity
+from security_guardian.policy import PolicyEngine
+from security_guardian.rulepack import RulePackError
+from security_guardian.scanner import ENTROPY_CANDIDATE
 
 class Colors:
     RED = '\033[91m'
@@ -25,36 +20,36 @@ class Colors:
 
 class ConfigLoader:
     @staticmethod
-    def load_config(config_path: str = "config.json") -> Dict[str, Any]:
-        if not os.path.exists(config_path):
-            # If no config specific found, look in the script directory or parent
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            parent_dir = os.path.dirname(script_dir)
-            possible_paths = [
-                os.path.join(script_dir, "config.json"),
-                os.path.join(parent_dir, "config.json")
-            ]
-            for path in possible_paths:
-                if os.path.exists(path):
-                    config_path = path
-                    break
-            else:
-                # If still not found, return default (empty patterns is bad but handles crash)
-                return DEFAULT_CONFIG
+    def find_config(config_path: str = "config.json") -> Optional[str]:
+        if os.path.exists(config_path):
+            return config_path
+        # If no config specific found, look in the script directory or parent
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        parent_dir = os.path.dirname(script_dir)
+        for path in (os.path.join(script_dir, "config.json"), os.path.join(parent_dir, "config.json")):
+            if os.path.exists(path):
+                return path
+        return None
 
+    @staticmethod
+    def load_policy(config_path: str = "config.json") -> PolicyEngine:
+        """The config file is a rule pack; without one the built-in rules apply."""
+        path = ConfigLoader.find_config(config_path)
+        if path is None:
+            return PolicyEngine()
         try:
-            with open(config_path, 'r') as f:
-                return json.load(f)
-        except Exception as e:
+            return PolicyEngine(path)
+        except RulePackError as e:
             print(f"{Colors.YELLOW}[WARN] Failed to load config: {e}. Using defaults.{Colors.RESET}")
-            return DEFAULT_CONFIG
+            return PolicyEngine()
 
 class SecretScanner:
-    def __init__(self, config: Dict[str, Any]):
-        self.config = config
+    def __init__(self, policy: PolicyEngine):
+        self.policy = policy
         self.found_issues = []
-        self.patterns = config.get("patterns", [])
-        self.severity_actions = config.get("severity_actions", DEFAULT_CONFIG["severity_actions"])
+
+    def action_for(self, severity: str) -> str:
+        return self.policy.get_action(Severity(severity))
 
     def scan_file(self, filepath: str):
         try:
@@ -66,50 +61,37 @@ class SecretScanner:
             print(f"{Colors.YELLOW}[WARN] Could not read file {filepath}: {e}{Colors.RESET}")
 
     def calculate_entropy(self, text: str) -> float:
-        if not text:
-            return 0
-        prob = [float(text.count(c)) / len(text) for c in dict.fromkeys(list(text))]
-        entropy = - sum([p * math.log(p) / math.log(2.0) for p in prob])
-        return entropy
+        return shannon_entropy(text)
 
     def scan_line(self, filepath: str, line_num: int, line: str):
-        context_keywords = self.config.get("context_keywords", [])
         found_match = False
         
-        # 1. Regex Scan
-        for pattern_def in self.patterns:
-            regex = pattern_def.get("regex")
-            base_severity = pattern_def.get("severity", "LOW")
-            name = pattern_def.get("name", "Unknown Secret")
-            
-            if re.search(regex, line):
-                found_match = True
-                severity = base_severity
-                extra_info = ""
-                
-                # Context Check: Upgrade MEDIUM -> HIGH if risky keywords found
-                if severity == "MEDIUM":
-                    for kw in context_keywords:
-                        if kw.lower() in line.lower():
-                            severity = "HIGH"
-                            extra_info = f" (Context: Found '{kw}')"
-                            break
-                            
-                self.found_issues.append({
-                    "file": filepath,
-                    "line": line_num,
-                    "type": name + extra_info,
-                    "severity": severity,
-                    "content": line.strip()
-                })
+        # 1. Regex Scan (same rules and matcher as the security_guardian package)
+        matched, keyword = self.policy.match_line(line)
+        for pattern_def in matched:
+            found_match = True
+            severity = Severity(pattern_def["severity"]).value
+            extra_info = ""
+
+            # Context Check: Upgrade MEDIUM -> HIGH if risky keywords found
+            if severity == "MEDIUM" and keyword is not None:
+                severity = "HIGH"
+                extra_info = f" (Context: Found '{keyword}')"
+
+            self.found_issues.append({
+                "file": filepath,
+                "line": line_num,
+                "type": pattern_def["name"] + extra_info,
+                "severity": severity,
+                "content": line.strip()
+            })
 
         # 2. Entropy Scan (Only if no regex match found to avoid duplicates)
         # Scan string literals > 15 chars
         if not found_match:
-            strings = re.findall(r"['\"]([A-Za-z0-9/+]{16,})['\"]", line)
-            for s in strings:
+            for s in ENTROPY_CANDIDATE.findall(line):
                 entropy = self.calculate_entropy(s)
-                if entropy > 4.5:
+                if entropy > ENTROPY_THRESHOLD:
                      self.found_issues.append({
                         "file": filepath,
                         "line": line_num,
@@ -138,7 +120,7 @@ class SecretScanner:
         # Determine blocking status first
         for issue in self.found_issues:
             sev = issue["severity"]
-            action = self.severity_actions.get(sev, "LOG")
+            action = self.action_for(sev)
             if action == "BLOCK":
                 should_block = True
 
@@ -163,7 +145,7 @@ class SecretScanner:
         
         for issue in self.found_issues:
             sev = issue["severity"]
-            action = self.severity_actions.get(sev, "LOG")
+            action = self.action_for(sev)
             
             color = Colors.RED if action == "BLOCK" else Colors.YELLOW
             
@@ -194,14 +176,14 @@ class SecretScanner:
 def main():
     parser = argparse.ArgumentParser(description="Secret Leakage Prevention Scanner")
     parser.add_argument("files", metavar="F", type=str, nargs="+", help="Files to scan")
-    parser.add_argument("--config", type=str, help="Path to config file", default="config.json")
+    parser.add_argument("--config", type=str, help="Path to config file (a JSON or TOML rule pack)", default="config.json")
     parser.add_argument("--validate", action="store_true", help="Simulate cloud validation of secrets")
     parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format (text|json)")
     
     args = parser.parse_args()
     
-    config = ConfigLoader.load_config(args.config)
-    scanner = SecretScanner(config)
+    policy = ConfigLoader.load_policy(args.config)
+    scanner = SecretScanner(policy)
     
     for filepath in args.files:
         if os.path.isfile(filepath):
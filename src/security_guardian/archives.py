@@ -0,0 +1,138 @@
+import bz2
+import gzip
+import io
+import lzma
+import tarfile
+import zipfile
+import zlib
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+# Classification categories (see classify.py) that may hold scannable members
+ARCHIVE_CATEGORIES = ("archive", "compressed")
+# Extensions let through the extension filter when archives are scanned
+ARCHIVE_EXTENSIONS = {
+    ".zip", ".jar", ".war", ".ear", ".aar", ".apk", ".whl", ".egg", ".nupkg",
+    ".tar", ".tgz", ".tbz2", ".txz", ".gz", ".bz2", ".xz",
+}
+ZIP_EXTENSIONS = {".zip", ".jar", ".war", ".ear", ".aar", ".apk", ".whl", ".egg", ".nupkg"}
+
+# Nesting levels entered below a file (archives and compression layers)
+DEFAULT_MAX_DEPTH = 4
+# Decompressed bytes one top-level archive may produce, nested content included
+DEFAULT_BUDGET = 256 * 1024 * 1024
+
+# Raised by corrupt, truncated, encrypted or unsupported archives
+ARCHIVE_ERRORS = (
+    zipfile.BadZipFile, tarfile.TarError, lzma.LZMAError, zlib.error,
+    EOFError, OSError, NotImplementedError, RuntimeError,
+)
+
+
+class ArchiveBudgetExceeded(Exception):
+    """An archive decompressed to more than its budget (e.g. a zip bomb)."""
+
+
+class DecompressionBudget:
+    """Decompressed bytes left for one top-level archive."""
+
+    def __init__(self, limit: int):
+        self.remaining = limit
+
+    def charge(self, size: int):
+        self.remaining -= size
+        if self.remaining < 0:
+            raise ArchiveBudgetExceeded()
+
+
+class BudgetedReader:
+    """Charges every byte read from a decompressing stream to a budget."""
+
+    def __init__(self, stream: BinaryIO, budget: DecompressionBudget):
+        self.stream = stream
+        self.budget = budget
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            # Read in blocks so a bomb is stopped before it is in memory
+            parts = []
+            while True:
+                part = self.read(1024 * 1024)
+                if not part:
+                    return b"".join(parts)
+                parts.append(part)
+        data = self.stream.read(size)
+        self.budget.charge(len(data))
+        return data
+
+
+class PrefixedReader:
+    """A stream with its already-read first bytes put back in front."""
+
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self.head = head
+        self.stream = stream
+
+    def read(self, size: int = -1) -> bytes:
+        head, self.head = self.head, b""
+        if size is None or size < 0:
+            return head + self.stream.read()
+        if len(head) >= size:
+            self.head = head[size:]
+            return head[:size]
+        return head + self.stream.read(size - len(head))
+
+
+def archive_kind(head: bytes) -> Optional[str]:
+    """The container format of content starting with head, if it can be opened."""
+    if head.startswith((b"PK\x03\x04", b"PK\x05\x06")):
+        return "zip"
+    if head[257:262] == b"ustar":
+        return "tar"
+    if head.startswith(b"\x1f\x8b"):
+        return "gzip"
+    if head.startswith(b"BZh"):
+        return "bz2"
+    if head.startswith(b"\xfd7zXZ\x00"):
+        return "xz"
+    return None
+
+
+_DECOMPRESSORS = {
+    "gzip": lambda f: gzip.GzipFile(fileobj=f),
+    "bz2": bz2.BZ2File,
+    "xz": lzma.LZMAFile,
+}
+
+
+def iter_members(stream: BinaryIO, head: bytes, budget: DecompressionBudget,
+                 seekable: bool = False) -> Iterator[Tuple[Optional[str], BinaryIO, Optional[int]]]:
+    """
+    Yields (name, content, size) for the regular members of an archive whose
+    content starts with head (already read from stream), without extracting
+    anything to disk. A compressed stream yields its decompressed content
+    once, named None. Each member must be consumed before the next one is
+    requested: tar archives are read as a stream. seekable: stream is a file
+    that can be rewound (otherwise a zip is buffered, within the budget).
+    """
+    kind = archive_kind(head)
+    if kind == "zip":
+        if seekable:
+            stream.seek(0)
+        else:
+            data = head + BudgetedReader(stream, budget).read()
+            stream = io.BytesIO(data)
+        with zipfile.ZipFile(stream) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as content:
+                        # Never yields more than file_size: the header bounds it
+                        yield info.filename, BudgetedReader(content, budget), info.file_size
+    elif kind == "tar":
+        with tarfile.open(fileobj=PrefixedReader(head, stream), mode="r|") as archive:
+            for member in archive:
+                if member.isfile():
+                    name = member.name[2:] if member.name.startswith("./") else member.name
+                    yield name, archive.extractfile(member), member.size
+    elif kind is not None:
+        with _DECOMPRESSORS[kind](PrefixedReader(head, stream)) as content:
+            yield None, BudgetedReader(content, budget), None
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import math
+import os
+from typing import Any, Dict, List
+
+# Loaded by scan when present in the working directory
+BASELINE_FILE = ".security-guardian-baseline.json"
+BASELINE_FORMAT = 1
+
+# Baselines with more fingerprints are held in a Bloom filter instead of a set
+BLOOM_THRESHOLD = 1_000_000
+# Chance that a new finding is taken for a known one (Bloom filter only)
+BLOOM_ERROR_RATE = 1e-6
+
+
+class BaselineError(ValueError):
+    """A baseline file that cannot be read or parsed."""
+
+
+def match_digest(rule: str, match: str) -> str:
+    """
+    The path-independent half of a fingerprint: the rule (without
+    decorations such as ' (Context: prod)') and the matched text with
+    surrounding whitespace removed. Line numbers are not part of it, so
+    findings survive edits elsewhere in the file.
+    """
+    return hashlib.blake2b(f"{rule}\0{match.strip()}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def fingerprint(path: str, digest: str) -> int:
+    """64-bit fingerprint of a finding: its match digest at a path (relative, '/'-separated)."""
+    return int.from_bytes(hashlib.blake2b(f"{path}\0{digest}".encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def relative_path(filepath: str, root: str) -> str:
+    """The path a baseline under root records for a finding in filepath."""
+    return os.path.relpath(os.path.abspath(filepath), root).replace(os.sep, "/")
+
+
+class BloomFilter:
+    """Bit array with k probes per 64-bit key, sized for BLOOM_ERROR_RATE."""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.probes = max(1, round(self.size / max(capacity, 1) * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: int):
+        # Double hashing: the key's halves are two independent hashes
+        h1, h2 = key & 0xFFFFFFFF, (key >> 32) | 1
+        for i in range(self.probes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: int):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class Baseline:
+    """
+    Fingerprints of accepted findings. Paths are taken relative to root
+    (the baseline file's directory), so the same baseline works wherever
+    the scan is started from. Lookups cost the same for any size.
+    """
+
+    def __init__(self, fingerprints: List[int], root: str):
+        self.root = os.path.abspath(root)
+        self.count = len(fingerprints)
+        if self.count > BLOOM_THRESHOLD:
+            self._keys = BloomFilter(self.count)
+            for fp in fingerprints:
+                self._keys.add(fp)
+        else:
+            self._keys = set(fingerprints)
+        # Last path looked up: findings of one file arrive together
+        self._last = (None, None)
+
+    def relative(self, filepath: str) -> str:
+        if self._last[0] != filepath:
+            self._last = (filepath, relative_path(filepath, self.root))
+        return self._last[1]
+
+    def suppresses(self, filepath: str, digest: str) -> bool:
+        return fingerprint(self.relative(filepath), digest) in self._keys
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def load(cls, path: str) -> "Baseline":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            fingerprints = [int(entry["fingerprint"], 16) for entry in data["findings"]]
+        except OSError as e:
+            raise BaselineError(f"Cannot read baseline {path}: {e}")
+        except (ValueError, KeyError, TypeError) as e:
+            raise BaselineError(f"{path}: invalid baseline: {e}")
+        return cls(fingerprints, os.path.dirname(os.path.abspath(path)))
+
+
+def write_baseline(path: str, findings: List[Dict[str, Any]]):
+    """
+    Writes findings ({"fingerprint", "type", "file", "line"}, paths relative
+    to the file's directory) sorted by file and line, so that regenerated
+    baselines diff cleanly. Line numbers are informational only.
+    """
+    findings = sorted(findings, key=lambda f: (f["file"], f["line"], f["type"], f["fingerprint"]))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": BASELINE_FORMAT, "findings": findings}, f, indent=2)
+        f.write("\n")
+    os.replace(tmp, path)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from . import __version__
+from .policy import PolicyEngine
+
+# (line_number, secret_type, severity, content_snippet, digest)
+CachedFinding = Tuple[int, str, str, str, str]
+# Bump when CachedFinding changes shape
+CACHE_FORMAT = 3
+
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def blob_sha(data: bytes) -> str:
+    """Returns the git blob SHA-1 of the content (same as `git ls-files -s`)."""
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+def blob_sha_stream(f: BinaryIO, size: int, chunk_size: int = 1024 * 1024) -> str:
+    """blob_sha of an open file, read in chunks (size is its length in bytes)."""
+    h = hashlib.sha1(b"blob %d\0" % size)
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    On-disk cache mapping a file's content hash plus the ruleset fingerprint
+    to the findings the file produced.
+    Backed by SQLite so that worker processes can share one cache file.
+    """
+
+    def __init__(self, cache_dir: str, policy: PolicyEngine, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 settings: Optional[Dict[str, Any]] = None):
+        self.path = os.path.join(cache_dir, "results.sqlite3")
+        self.max_entries = max_entries
+        self._policy_fingerprint = policy.fingerprint
+        self.configure(settings or {})
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def configure(self, settings: Dict[str, Any]):
+        """
+        Sets the scanner settings that change findings (see
+        SecretScanner.cache_settings): entries made under other settings miss.
+        """
+        # Scanner version is part of the fingerprint: engine changes invalidate too
+        self.fingerprint = hashlib.sha256(
+            f"{__version__}:{CACHE_FORMAT}:{self._policy_fingerprint}:"
+            f"{json.dumps(settings, sort_keys=True)}".encode("utf-8")
+        ).hexdigest()
+
+    def __getstate__(self):
+        # Connections cannot cross process boundaries; workers reconnect lazily
+        state = self.__dict__.copy()
+        state["_conn"] = None
+        return state
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " blob TEXT NOT NULL,"
+                " fingerprint TEXT NOT NULL,"
+                " findings TEXT NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (blob, fingerprint))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, blob: str) -> Optional[List[CachedFinding]]:
+        """Returns the cached findings for a blob, or None on a miss."""
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT findings FROM results WHERE blob = ? AND fingerprint = ?",
+                (blob, self.fingerprint)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE results SET last_used = ? WHERE blob = ? AND fingerprint = ?",
+                (time.time(), blob, self.fingerprint)
+            )
+            return [tuple(f) for f in json.loads(row[0])]
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning(f"Result cache lookup failed: {e}")
+            return None
+
+    def put(self, blob: str, findings: List[CachedFinding]):
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO results (blob, fingerprint, findings, last_used) VALUES (?, ?, ?, ?)",
+                (blob, self.fingerprint, json.dumps(findings), time.time())
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache update failed: {e}")
+
+    def prune(self):
+        """
+        Drops entries from other rulesets or settings, then evicts the least recently
+        used entries beyond max_entries.
+        """
+        try:
+            conn = self._connect()
+            conn.execute("DELETE FROM results WHERE fingerprint != ?", (self.fingerprint,))
+            conn.execute(
+                "DELETE FROM results WHERE rowid IN ("
+                " SELECT rowid FROM results ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache pruning failed: {e}")
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
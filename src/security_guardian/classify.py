@@ -0,0 +1,85 @@
+import re
+from typing import Dict, Optional
+
+# Bytes read up front: enough to classify, and the whole content of most source files
+HEAD_BYTES = 64 * 1024
+# A NUL byte this close to the start marks the content as binary
+BINARY_SNIFF_BYTES = 1024
+
+# Signatures of common non-text formats, by skip category. Each holds bytes
+# that never occur in text; short ones would misfire on text, and those
+# formats are caught by the NUL check anyway.
+MAGIC_SIGNATURES = {
+    "image": rb"\x89PNG\r\n\x1a\n|\xff\xd8\xff|II\*\x00|MM\x00\*",
+    "archive": rb"PK\x03\x04|PK\x05\x06|7z\xbc\xaf\x27\x1c|Rar!\x1a\x07",
+    "compressed": rb"\x1f\x8b|\xfd7zXZ\x00|\x28\xb5\x2f\xfd",
+    "executable": rb"\x7fELF|\xcf\xfa\xed\xfe|\xce\xfa\xed\xfe|\xca\xfe\xba\xbe|\x00asm",
+    "document": rb"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1",
+    "media": rb"\x00\x00\x00[\x08-\x40]ftyp|\x1aE\xdf\xa3",
+    "database": rb"SQLite format 3\x00",
+}
+# Printable signatures: a text file may start the same way, so they only
+# count when the sniffed prefix is not text
+PRINTABLE_SIGNATURES = {
+    "image": rb"GIF8[79]a|RIFF....WEBP",
+    "archive": rb".{257}ustar",
+    "compressed": rb"BZh[1-9]1AY&SY",
+    "document": rb"%PDF-",
+}
+
+# Control bytes that do not occur in text (tab, newlines, form feed and ESC do)
+_CONTROL_BYTES = re.compile(rb"[\x00-\x08\x0e-\x1a\x1c-\x1f\x7f]")
+
+
+def _compile(signatures: Dict[str, bytes]):
+    return re.compile(
+        b"|".join(b"(?P<%s>%s)" % (name.encode(), sig) for name, sig in signatures.items()),
+        re.DOTALL
+    )
+
+
+_SIGNATURES = _compile(MAGIC_SIGNATURES)
+_PRINTABLE_SIGNATURES = _compile(PRINTABLE_SIGNATURES)
+
+
+def _is_text(prefix: bytes) -> bool:
+    """No control bytes, and valid UTF-8 (a character cut at the end is fine)."""
+    if _CONTROL_BYTES.search(prefix):
+        return False
+    try:
+        prefix.decode("utf-8")
+    except UnicodeDecodeError as e:
+        return e.start >= len(prefix) - 3 and e.reason == "unexpected end of data"
+    return True
+
+
+def classify_head(head: bytes) -> Optional[str]:
+    """
+    Returns the skip category of content starting with head ("image",
+    "archive", ..., or "binary" for other content with NUL bytes), or None
+    for text that should be scanned.
+    """
+    m = _SIGNATURES.match(head)
+    if m is not None:
+        return m.lastgroup
+    m = _PRINTABLE_SIGNATURES.match(head)
+    if m is not None and not _is_text(head[:BINARY_SNIFF_BYTES]):
+        return m.lastgroup
+    if b"\0" in head[:BINARY_SNIFF_BYTES]:
+        return "binary"
+    return None
+
+
+def parse_size(value: str) -> int:
+    """'512K', '10M', '1G' or a plain byte count -> bytes."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+    value = value.strip().upper().rstrip("B")
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def format_skipped(skipped: Dict[str, int]) -> str:
+    """{'binary': 3, 'too_large': 1} -> '4 files (binary: 3, too_large: 1)'"""
+    details = ", ".join(f"{category}: {count}" for category, count in sorted(skipped.items()))
+    return f"{sum(skipped.values())} files ({details})"
@@ -1,12 +1,27 @@
 import argparse
 import sys
+from collections import deque
 import json
 import os
 from .policy import PolicyEngine
-from .scanner import SecretScanner
-from .validator import SecretValidator
-from .models import Severity
-from .hygiene import check_hygiene
+from .scanner import SecretScanner, read_source
+from .validator import AsyncValidator, SecretValidator, ValidationPipeline, DEFAULT_CONCURRENCY
+from .models import ResultStore, Severity
+from .hygiene import HygieneCheck
+from .cache import ResultCache, DEFAULT_MAX_ENTRIES
+from .output import STREAMING_FORMATS, create_emitter, finding_entry, rule_id, write_json_report
+from .daemon import ScanDaemon, default_socket_path, request_daemon
+from .exclusions import load_ignore_file
+from .rulepack import RulePackError, default_cache_dir
+from .bench import run_bench
+from .fleet import run_fleet
+from .archives import DEFAULT_BUDGET, DEFAULT_MAX_DEPTH
+from .classify import format_skipped, parse_size
+from .gitobjects import check_rev_range
+from .profiling import ScanProfiler, timed
+from .safety import DEFAULT_RULE_TIMEOUT
+from .baseline import BASELINE_FILE, Baseline, BaselineError, fingerprint, relative_path, write_baseline
+from .scanner import MAX_LINE_LENGTH
 
 import stat
 
@@ -28,8 +43,8 @@ def install_hook():
     # Updated hook content to use --staged
     hook_content = """#!/bin/sh
 echo "Running Security Guardian..."
-# Scan current directory in staged mode
-security-guardian scan . --staged
+# Scan current directory in staged mode (served by 'security-guardian daemon' when running)
+security-guardian scan . --staged --daemon
 if [ $? -ne 0 ]; then
     echo "❌ Security Check Failed. Commit Blocked."
     exit 1
@@ -49,99 +64,276 @@ exit 0
         print("[SUCCESS] Pre-commit hook installed successfully.")
         print(f"   Location: {hook_path}")
         print("   Behavior: Runs 'security-guardian scan . --staged' before every commit.")
+        print("   Tip: Start 'security-guardian daemon' to keep rules warm between commits.")
         
     except Exception as e:
         print(f"[ERROR] Error installing hook: {e}")
         sys.exit(1)
 
+def _iter_findings(scanner: SecretScanner, args, scan_mode: str):
+    """Yields findings for all requested paths (planned as one scan) as they are produced."""
+    if args.verbose:
+        print(f"[INFO] Scanning {', '.join(args.paths)} (Mode: {scan_mode})", file=_info_stream(args))
+    yield from scanner.iter_scan_paths(args.paths, mode=scan_mode, rev_range=args.history or args.ref or "--all")
+
+def _info_stream(args):
+    # Keep stdout machine-readable for streaming formats
+    return sys.stderr if args.format in STREAMING_FORMATS else sys.stdout
+
+def _emit_validated(pending, emit, wait: bool = False):
+    """Emits findings in scan order as soon as their validation is done."""
+    while pending and (wait or pending[0][1].done()):
+        issue, status = pending.popleft()
+        issue.validation_status = status.result()
+        emit(issue)
+
+def _scan_mode(args) -> str:
+    # Priority: History > Ref > Staged > From-Index > All-Files > Include-Untracked > Default
+    if args.history:
+        return "history"
+    if args.ref:
+        return "ref"
+    if args.staged:
+        return "staged"
+    if args.from_index:
+        return "index"
+    if args.all_files:
+        return "all-files"
+    if args.include_untracked:
+        return "untracked"
+    return "default"
+
+def _print_hygiene(messages, info):
+    if messages:
+        print("\n[HYGIENE CHECK]", file=info)
+        for msg in messages:
+            print(msg, file=info)
+        print("-" * 40, file=info)
+
+def _load_policy(args) -> PolicyEngine:
+    """Built-in rules, or the --rules pack (analyzed form cached under --cache-dir)."""
+    if not args.rules:
+        return PolicyEngine()
+    try:
+        return PolicyEngine(args.rules, cache_dir=args.cache_dir or default_cache_dir())
+    except RulePackError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+def _baseline_path(args):
+    """--baseline, or the baseline file in the working directory if there is one."""
+    if args.no_baseline:
+        return None
+    return args.baseline or (BASELINE_FILE if os.path.exists(BASELINE_FILE) else None)
+
+def _load_baseline(args):
+    path = _baseline_path(args)
+    if not path:
+        return None
+    try:
+        return Baseline.load(path)
+    except BaselineError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+def _scan_via_daemon(args) -> bool:
+    """
+    Serves the scan from a running daemon. Returns False (scan in-process)
+    if the request can't be served that way or no daemon is listening.
+    """
+    scan_mode = _scan_mode(args)
+    if scan_mode not in ("default", "staged") or len(args.paths) != 1 or args.validate_live \
+            or args.exclude or args.cache_dir or args.jobs != 1 or args.max_file_size is not None or args.archives \
+            or args.profile or args.file_timeout or args.rule_timeout != DEFAULT_RULE_TIMEOUT \
+            or args.max_line_length != MAX_LINE_LENGTH or _baseline_path(args):
+        return False
+    socket_path = args.daemon_socket or default_socket_path(args.paths[0])
+    response = socket_path and request_daemon(socket_path, {
+        "command": "scan", "mode": scan_mode, "root": os.path.abspath(args.paths[0]),
+        "rules": os.path.abspath(args.rules) if args.rules else None
+    })
+    if not response or "issues" not in response:
+        if args.verbose:
+            print("[INFO] No scan daemon available; scanning in-process.", file=_info_stream(args))
+        return False
+
+    _print_hygiene(response["hygiene"], _info_stream(args))
+    results_out = response["issues"]
+    if args.validate:
+        for entry in results_out:
+            entry["validation"] = SecretValidator.validate(entry["type"], entry["content"])
+    if args.format in STREAMING_FORMATS:
+        emitter = create_emitter(args.format, sys.stdout, _load_policy(args))
+        emitter.start()
+        for entry in results_out:
+            emitter.emit(entry)
+        emitter.finish(response["blocking"])
+        results_out = None
+    _report(args, results_out, response["blocking"], scan_mode)
+    return True
+
 def run_scan(args):
+    if args.daemon and _scan_via_daemon(args):
+        return
+
     should_block = False
+    info = _info_stream(args)
+    profiler = ScanProfiler() if args.profile else None
     
-    # Phase 0: Hygiene Checks
-    hygiene_block, hygiene_messages = check_hygiene()
-    if hygiene_messages:
-        print("\n[HYGIENE CHECK]")
-        for msg in hygiene_messages:
-            print(msg)
-        print("-" * 40)
-        
-    if hygiene_block:
-        should_block = True
+    # Phase 0: Hygiene Checks (git lists the sensitive files while the scan runs)
+    with timed(profiler, "hygiene"):
+        hygiene = HygieneCheck()
 
     # Phase 1: Determine Mode
-    # Priority: Staged > All-Files > Include-Untracked > Default
-    scan_mode = "default"
-    if args.staged:
-        scan_mode = "staged"
-    elif args.all_files:
-        scan_mode = "all-files"
-    elif args.include_untracked:
-        scan_mode = "untracked"
+    scan_mode = _scan_mode(args)
 
     # Phase 2: Load Ignore File
-    ignore_file_path = ".security-guardian-ignore"
-    if os.path.exists(ignore_file_path):
-        with open(ignore_file_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    args.exclude.append(line)
+    args.exclude.extend(load_ignore_file())
     
     # Initialize Components
-    policy = PolicyEngine()
+    policy = _load_policy(args)
     # Note: scan_all_files arg in init is for extension filtering override
     # If mode is all-files, we want to disable extension filtering in scanner too
     disable_ext_filter = (scan_mode == "all-files")
     
-    scanner = SecretScanner(policy, exclude_patterns=args.exclude, scan_all_files=disable_ext_filter)
-    
-    # Run Scan
-    for path in args.paths:
-        if args.verbose:
-            print(f"[INFO] Scanning {path} (Mode: {scan_mode})")
-        scanner.scan_path(path, mode=scan_mode)
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, policy, max_entries=args.cache_size)
+
+    scanner = SecretScanner(policy, exclude_patterns=args.exclude, scan_all_files=disable_ext_filter, jobs=args.jobs, cache=cache,
+                            max_file_size=args.max_file_size, scan_archives=args.archives,
+                            archive_depth=args.archive_depth, archive_budget=args.archive_budget,
+                            max_line_length=args.max_line_length, rule_timeout=args.rule_timeout,
+                            file_timeout=args.file_timeout, baseline=_load_baseline(args))
+    scanner.profiler = profiler
     
+    # Run Scan: findings are streamed per file; only buffered formats collect them
+    emitter = None
+    if args.format in STREAMING_FORMATS:
+        emitter = create_emitter(args.format, sys.stdout, policy)
+        emitter.start()
+
     # Determine Block/Warn (from Scan)
-    # should_block is already potentially True from hygiene
-    results_out = []
+    # Hygiene results are added once the scan is done
+    # Buffered formats keep findings compact (snippets are re-read when printed)
+    results = ResultStore(read_source)
+    if emitter:
+        emit = lambda issue: emitter.emit(finding_entry(issue, policy.get_action(issue.severity)))
+    else:
+        emit = results.add
+
+    # Live validation runs on a background event loop while the scan continues
+    pipeline = None
+    pending = deque()
+    if args.validate_live:
+        pipeline = ValidationPipeline(AsyncValidator(concurrency=args.validate_concurrency))
     
-    for issue in scanner.results:
+    for issue in _iter_findings(scanner, args, scan_mode):
         action = policy.get_action(issue.severity)
         if action == "BLOCK":
             should_block = True
             
         # Optional Verification
-        val_status = "N/A"
         if args.validate:
-            val_status = SecretValidator.validate(issue.secret_type, issue.content_snippet)
-            
-        results_out.append({
-            "file": issue.file_path,
+            issue.validation_status = SecretValidator.validate(issue.secret_type, issue.content_snippet)
+
+        with timed(profiler, "output"):
+            if pipeline:
+                pending.append((issue, pipeline.submit(issue.file_path, issue.secret_type, issue.content_snippet)))
+                _emit_validated(pending, emit)
+            else:
+                emit(issue)
+
+    if pipeline:
+        pipeline.flush()
+        with timed(profiler, "output"):
+            _emit_validated(pending, emit, wait=True)
+        pipeline.close()
+
+    if cache:
+        cache.prune()
+        cache.close()
+
+    with timed(profiler, "hygiene"):
+        hygiene_block, hygiene_messages = hygiene.result()
+    _print_hygiene(hygiene_messages, info)
+    if hygiene_block:
+        should_block = True
+
+    if args.verbose and scanner.skipped:
+        print(f"[INFO] Skipped {format_skipped(scanner.skipped)}", file=info)
+    if scanner.suppressed:
+        print(f"[INFO] {scanner.suppressed} known finding(s) suppressed by the baseline", file=info)
+    if scanner.partial:
+        # Over a time limit: findings up to that point are reported, the rest was not scanned
+        print(f"[WARN] Partially scanned {len(scanner.partial)} file(s) (time limit):", file=info)
+        for path, reason in sorted(scanner.partial.items()):
+            print(f"   {path}: {reason}", file=info)
+
+    results_out = None
+    if not emitter:
+        results_out = (finding_entry(issue, policy.get_action(issue.severity)) for issue in results)
+    try:
+        with timed(profiler, "output"):
+            if emitter:
+                emitter.finish(should_block)
+            _report(args, results_out, should_block, scan_mode)
+    finally:
+        # _report exits: the profile goes to stderr on the way out
+        if profiler is not None:
+            sys.stdout.flush()
+            print("\n".join(profiler.format(policy.patterns, top=args.profile_top)), file=sys.stderr)
+
+def run_baseline(args):
+    """
+    Records every current finding in the baseline file: later scans report
+    only findings that are not in it.
+    """
+    scan_mode = "all-files" if args.all_files else "default"
+    args.exclude.extend(load_ignore_file())
+    policy = _load_policy(args)
+    scanner = SecretScanner(policy, exclude_patterns=args.exclude, scan_all_files=args.all_files, jobs=args.jobs,
+                            digests=True)
+
+    # Paths are recorded relative to the baseline file's directory
+    root = os.path.dirname(os.path.abspath(args.output))
+    findings = []
+    for issue in scanner.iter_scan_paths(args.paths, mode=scan_mode):
+        relative = relative_path(issue.file_path, root)
+        findings.append({
+            "fingerprint": f"{fingerprint(relative, issue.digest):016x}",
+            "type": rule_id(issue.secret_type),
+            "file": relative,
             "line": issue.line_number,
-            "type": issue.secret_type,
-            "severity": issue.severity.value,
-            "action": action,
-            "content": issue.content_snippet,
-            "validation": val_status
         })
+    write_baseline(args.output, findings)
+    print(f"[INFO] Baseline written to {args.output}: {len(findings)} findings")
 
+def _report(args, results_out, should_block: bool, scan_mode: str):
+    """Prints buffered results (streamed formats pass None) and exits."""
     # Output
-    if args.format == "json":
-        print(json.dumps({"blocking": should_block, "issues": results_out}, indent=2))
+    if results_out is None:
+        pass
+    elif args.format == "json":
+        write_json_report(sys.stdout, should_block, results_out)
     else:
         # Text Output
-        if not results_out:
+        found = False
+        for res in results_out:
+            if not found:
+                print(f"\n[ALERT] SCAN COMPLETE: Issues Found")
+                found = True
+            icon = "[X]" if res['action'] == "BLOCK" else "[!]"
+            print(f"{icon} [{res['severity']}] {res['type']} -> {res['action']}")
+            print(f"   File: {res['file']}:{res['line']}")
+            if res.get('commit'):
+                print(f"   Commit: {res['commit']}")
+            print(f"   Snippet: {res['content']}")
+            if args.validate or args.validate_live:
+                print(f"   Cloud Check: {res['validation']}")
+            print("-" * 40)
+        if not found:
             print(f"[OK] No secrets found ({scan_mode} mode).")
-        else:
-            print(f"\n[ALERT] SCAN COMPLETE: Issues Found")
-            for res in results_out:
-                icon = "[X]" if res['action'] == "BLOCK" else "[!]"
-                print(f"{icon} [{res['severity']}] {res['type']} -> {res['action']}")
-                print(f"   File: {res['file']}:{res['line']}")
-                print(f"   Snippet: {res['content']}")
-                if args.validate:
-                    print(f"   Cloud Check: {res['validation']}")
-                print("-" * 40)
     
     # Exit Code
     if should_block:
@@ -149,6 +341,28 @@ def run_scan(args):
     else:
         sys.exit(0)
 
+def run_daemon(args):
+    socket_path = args.socket or default_socket_path(args.path)
+    if not socket_path:
+        print("[ERROR] Not a git repository; pass --socket explicitly.")
+        sys.exit(1)
+
+    if args.status or args.stop:
+        response = request_daemon(socket_path, {"command": "shutdown" if args.stop else "status"})
+        if response is None:
+            print(f"[INFO] No daemon listening on {socket_path}")
+            sys.exit(1)
+        print(json.dumps(response, indent=2))
+        sys.exit(0)
+
+    try:
+        daemon = ScanDaemon(args.path, exclude_patterns=args.exclude, rules=args.rules)
+        print(f"[INFO] Serving {daemon.root} on {socket_path} (watcher: {daemon.watcher.name})", flush=True)
+        daemon.serve(socket_path)
+    except (RuntimeError, RulePackError) as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
 def main():
     # Ensure generated output handles emojis correctly on all platforms
     if sys.stdout.encoding != 'utf-8':
@@ -165,21 +379,94 @@ def main():
     # Command: scan
     scan_parser = subparsers.add_parser("scan", help="Scan files or directories for secrets")
     scan_parser.add_argument("paths", nargs="+", help="Paths to file or directory to scan")
-    scan_parser.add_argument("--format", choices=["text", "json"], default="text", help="Output format")
+    scan_parser.add_argument("--format", choices=["text", "json", "ndjson", "sarif"], default="text", help="Output format (ndjson/sarif stream findings as they are found)")
     scan_parser.add_argument("--validate", action="store_true", help="Attempt to validate found secrets")
+    scan_parser.add_argument("--validate-live", action="store_true", help="Verify AWS/GitHub credentials against the provider APIs (network calls)")
+    scan_parser.add_argument("--validate-concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum concurrent live validation requests")
     scan_parser.add_argument("--exclude", nargs="+", default=[], help="Patterns to exclude from scan")
+    scan_parser.add_argument("--rules", metavar="PACK", help="Rule pack (JSON or TOML) to use instead of the built-in rules")
     scan_parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    scan_parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes (0 = one per CPU)")
+    scan_parser.add_argument("--cache-dir", help="Directory for the persistent result cache (skips unchanged files) and analyzed rule packs")
+    scan_parser.add_argument("--max-file-size", type=parse_size, metavar="SIZE", help="Skip files larger than SIZE (e.g. 512K, 10M, 1G) without reading them")
+    scan_parser.add_argument("--archives", action="store_true", help="Scan inside zip/jar/tar/gzip/bz2/xz files (findings: archive!member:line)")
+    scan_parser.add_argument("--archive-depth", type=int, default=DEFAULT_MAX_DEPTH, help="Maximum nesting of archives and compression layers")
+    scan_parser.add_argument("--max-line-length", type=parse_size, default=MAX_LINE_LENGTH, metavar="SIZE", help="Rules search longer lines in overlapping windows of this size")
+    scan_parser.add_argument("--rule-timeout", type=float, default=DEFAULT_RULE_TIMEOUT, metavar="SECONDS", help="Time limit per search of a rule flagged as backtracking-prone (0 = none)")
+    scan_parser.add_argument("--file-timeout", type=float, metavar="SECONDS", help="Time limit per file; slower files are reported as partially scanned")
+    scan_parser.add_argument("--archive-budget", type=parse_size, default=DEFAULT_BUDGET, metavar="SIZE", help="Decompressed bytes allowed per archive (zip bomb guard)")
+    scan_parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES, help="Maximum number of cached file results")
+    scan_parser.add_argument("--profile", action="store_true", help="Print time per phase and time/calls/matches per rule to stderr")
+    scan_parser.add_argument("--profile-top", type=int, default=20, metavar="N", help="Number of rules listed by --profile (slowest first)")
+    scan_parser.add_argument("--baseline", metavar="FILE", help=f"Suppress the known findings listed in FILE (default: {BASELINE_FILE} if present)")
+    scan_parser.add_argument("--no-baseline", action="store_true", help="Report every finding, ignoring any baseline")
+    scan_parser.add_argument("--daemon", action="store_true", help="Use a running 'security-guardian daemon' if available (falls back to scanning in-process)")
+    scan_parser.add_argument("--daemon-socket", help="Socket of the daemon (default: <git dir>/security-guardian.sock)")
     
     # Mode Flags
     scan_parser.add_argument("--all-files", action="store_true", help="Scan ALL files (slower, but covers everything). Default: Safe Extensions + Tracked Files only.")
     scan_parser.add_argument("--staged", action="store_true", help="Scan ONLY staged files (Git Pre-commit mode).")
     scan_parser.add_argument("--include-untracked", action="store_true", help="Include untracked files (Git default ignores honored).")
+    scan_parser.add_argument("--history", nargs="?", const="--all", type=check_rev_range, metavar="REV_RANGE", help="Scan every blob in git history once (default: all refs), e.g. --history main~100..main")
+    scan_parser.add_argument("--ref", metavar="REF", help="Scan the files of one commit from the object store (works on bare mirrors), e.g. --ref HEAD")
+    scan_parser.add_argument("--from-index", action="store_true", help="Scan the staged version of every tracked file, read from the object store")
 
     scan_parser.set_defaults(func=run_scan)
 
     # Command: install-hook
     hook_parser = subparsers.add_parser("install-hook", help="Install Git pre-commit hook")
     hook_parser.set_defaults(func=lambda args: install_hook())
+
+    # Command: daemon
+    daemon_parser = subparsers.add_parser("daemon", help="Keep rules and results warm for fast repeated scans")
+    daemon_parser.add_argument("path", nargs="?", default=".", help="Repository to serve")
+    daemon_parser.add_argument("--socket", help="Unix socket path (default: <git dir>/security-guardian.sock)")
+    daemon_parser.add_argument("--exclude", nargs="+", default=[], help="Patterns to exclude from scan")
+    daemon_parser.add_argument("--rules", metavar="PACK", help="Rule pack (JSON or TOML) to use instead of the built-in rules")
+    daemon_parser.add_argument("--status", action="store_true", help="Show the status of a running daemon")
+    daemon_parser.add_argument("--stop", action="store_true", help="Stop a running daemon")
+    daemon_parser.set_defaults(func=run_daemon)
+
+    # Command: baseline
+    baseline_parser = subparsers.add_parser("baseline", help="Record the current findings as accepted, so scans report only new ones")
+    baseline_parser.add_argument("paths", nargs="*", default=["."], help="Paths to scan (default: .)")
+    baseline_parser.add_argument("--output", "-o", default=BASELINE_FILE, help=f"Baseline file to write (default: {BASELINE_FILE})")
+    baseline_parser.add_argument("--all-files", action="store_true", help="Scan all files on disk, not just tracked ones")
+    baseline_parser.add_argument("--exclude", nargs="+", default=[], help="Patterns to exclude from scan")
+    baseline_parser.add_argument("--rules", metavar="PACK", help="Rule pack (JSON or TOML) to use instead of the built-in rules")
+    baseline_parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes (0 = one per CPU)")
+    baseline_parser.set_defaults(func=run_baseline, cache_dir=None)
+
+    # Command: fleet
+    fleet_parser = subparsers.add_parser("fleet", help="Scan many repositories (work trees or bare mirrors) into one report")
+    fleet_parser.add_argument("manifest", help="File listing one repository path per line")
+    fleet_parser.add_argument("--format", choices=["ndjson", "sarif"], default="ndjson", help="Consolidated report format")
+    fleet_parser.add_argument("--output", "-o", help="Write the report to this file (default: stdout)")
+    fleet_parser.add_argument("--jobs", "-j", type=int, default=0, help="Repositories scanned in parallel (0 = one per CPU)")
+    fleet_parser.add_argument("--rules", metavar="PACK", help="Rule pack (JSON or TOML) to use instead of the built-in rules")
+    fleet_parser.add_argument("--exclude", nargs="+", default=[], help="Patterns to exclude in every repository")
+    fleet_parser.add_argument("--history", action="store_true", help="Scan every blob in each repository's history")
+    fleet_parser.add_argument("--max-file-size", type=parse_size, metavar="SIZE", help="Skip files larger than SIZE without reading them")
+    fleet_parser.add_argument("--file-timeout", type=float, metavar="SECONDS", help="Time limit per file; slower files are reported as partially scanned")
+    fleet_parser.add_argument("--cache-dir", help="Directory for analyzed rule packs and, below it, fleet checkpoints")
+    fleet_parser.add_argument("--checkpoint-dir", help="Directory for per-repository checkpoints (default: <cache dir>/fleet)")
+    fleet_parser.add_argument("--no-checkpoints", action="store_true", help="Neither read nor write checkpoints")
+    fleet_parser.add_argument("--fresh", action="store_true", help="Rescan every repository, replacing its checkpoint")
+    fleet_parser.add_argument("--verbose", action="store_true", help="Print a line per repository")
+    fleet_parser.set_defaults(func=run_fleet)
+
+    # Command: bench
+    bench_parser = subparsers.add_parser("bench", help="Benchmark the scanner on a synthetic corpus")
+    bench_parser.add_argument("--files", type=int, default=200, help="Number of files to generate")
+    bench_parser.add_argument("--lines", type=int, default=500, help="Lines per text file")
+    bench_parser.add_argument("--line-length", type=int, default=80, help="Approximate characters per line")
+    bench_parser.add_argument("--secret-density", type=float, default=0.001, help="Probability that a line holds a fake secret")
+    bench_parser.add_argument("--binary-ratio", type=float, default=0.05, help="Share of files written as binary")
+    bench_parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same corpus)")
+    bench_parser.add_argument("--repeat", type=int, default=1, help="Scan runs (the fastest is reported)")
+    bench_parser.add_argument("--corpus", help="Keep the generated corpus in this (empty) directory")
+    bench_parser.add_argument("--output", "-o", help="Write the results as JSON (for comparing releases)")
+    bench_parser.set_defaults(func=run_bench)
     
     args = parser.parse_args()
     if hasattr(args, 'func'):
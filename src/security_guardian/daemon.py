@@ -0,0 +1,357 @@
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import socket
+import socketserver
+import struct
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .exclusions import IGNORE_FILE, ExclusionMatcher, load_ignore_file
+from .hygiene import check_hygiene, sensitive_action
+from .models import ScanResult
+from .output import finding_entry
+from .policy import PolicyEngine
+from .rulepack import default_cache_dir
+from .scanner import SecretScanner
+
+SOCKET_NAME = "security-guardian.sock"
+
+# inotify(7) event bits
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_EVENT = struct.Struct("iIII")
+
+
+def git_dir(repo_path: str) -> Optional[str]:
+    try:
+        path = subprocess.run(
+            ["git", "rev-parse", "--absolute-git-dir"],
+            cwd=repo_path, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return path or None
+
+
+def default_socket_path(repo_path: str) -> Optional[str]:
+    """<git dir>/security-guardian.sock for the repository at repo_path."""
+    path = git_dir(repo_path)
+    return os.path.join(path, SOCKET_NAME) if path else None
+
+
+class PollingWatcher:
+    """Fallback without inotify: every request re-stats the indexed files."""
+
+    name = "polling"
+
+    def changes(self) -> Optional[Set[str]]:
+        # None: unknown, verify everything
+        return None
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Watches a working tree through inotify (via ctypes, Linux only).
+    Events are drained without blocking whenever changes() is called, so no
+    thread is needed; the daemon only looks at them when a request comes in.
+    """
+
+    name = "inotify"
+
+    def __init__(self, root: str, exclusions: ExclusionMatcher):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self.exclusions = exclusions
+        self._dirs: Dict[int, str] = {}
+        self._overflow = False
+        self._watch_tree(root)
+
+    def _watch_tree(self, top: str):
+        for current, dirs, _ in os.walk(top):
+            dirs[:] = [d for d in dirs if not self.exclusions.match_entry(os.path.join(current, d), is_dir=True)]
+            wd = self._add_watch(self.fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOSPC, errno.ENOMEM):
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            self._dirs[wd] = current
+
+    def changes(self) -> Optional[Set[str]]:
+        """Relative paths changed since the last call (None after an event overflow)."""
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size:offset + _EVENT.size + length].rstrip(b"\0")
+                offset += _EVENT.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    self._overflow = True
+                    continue
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self._dirs[wd]
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    if not self.exclusions.match_entry(path, is_dir=True):
+                        self._watch_tree(path)
+                changed.add(os.path.relpath(path, self.root))
+
+        if self._overflow:
+            self._overflow = False
+            return None
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(root: str, exclusions: ExclusionMatcher):
+    """inotify where available, polling otherwise."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, exclusions)
+        except (OSError, AttributeError) as e:
+            print(f"[WARN] inotify unavailable ({e}); falling back to polling.", file=sys.stderr)
+    return PollingWatcher()
+
+
+class ScanDaemon:
+    """
+    Keeps a repository's scan state warm between hook invocations: compiled
+    rules, the tracked-file listing, hygiene results and a per-file index
+    of findings. Files are only rescanned when the watcher reports a change
+    (or, when polling, when their mtime/size changes).
+    """
+
+    def __init__(self, root: str, exclude_patterns: Optional[List[str]] = None, watcher=None,
+                 rules: Optional[str] = None):
+        # Resolved before the chdir below
+        self.rules = os.path.abspath(rules) if rules else None
+        self.root = os.path.abspath(root)
+        os.chdir(self.root)  # hygiene checks and the ignore file are cwd-relative
+        self.extra_excludes = list(exclude_patterns or [])
+        self.policy = PolicyEngine(self.rules, cache_dir=default_cache_dir()) if self.rules else PolicyEngine()
+        self.scanner = SecretScanner(self.policy, exclude_patterns=self._exclude_patterns())
+        self.git_dir = git_dir(self.root) or os.path.join(self.root, ".git")
+        self.watcher = watcher or create_watcher(self.root, self.scanner.exclusions)
+
+        # relative path -> ((mtime_ns, size), findings)
+        self.index: Dict[str, Tuple[Tuple[int, int], List[ScanResult]]] = {}
+        self._tracked: List[str] = []
+        self._tracked_stamp = None
+        self._hygiene: Tuple[bool, List[str]] = (False, [])
+        self._hygiene_stamp = None
+        self._ignore_stamp = self._stamp(IGNORE_FILE)
+        self.started = time.time()
+        self.requests = 0
+
+    def _exclude_patterns(self) -> List[str]:
+        return self.extra_excludes + load_ignore_file()
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        # 1. Ignore file edited: recompile exclusions
+        stamp = self._stamp(IGNORE_FILE)
+        if stamp != self._ignore_stamp:
+            self._ignore_stamp = stamp
+            self.scanner = SecretScanner(self.policy, exclude_patterns=self._exclude_patterns())
+            if isinstance(self.watcher, InotifyWatcher):
+                self.watcher.exclusions = self.scanner.exclusions
+
+        # 2. Drop index entries of changed files
+        changed = self.watcher.changes()
+        if changed is None:
+            # Unknown: keep entries whose mtime/size still match
+            for rel in list(self.index):
+                if self._stamp(os.path.join(self.root, rel)) != self.index[rel][0]:
+                    del self.index[rel]
+        elif changed:
+            for rel in changed:
+                self.index.pop(rel, None)
+                prefix = rel + os.sep
+                for key in [k for k in self.index if k.startswith(prefix)]:
+                    del self.index[key]
+
+        # 3. The git index changed (add, commit, checkout): relist tracked files
+        index_stamp = self._stamp(os.path.join(self.git_dir, "index"))
+        if index_stamp != self._tracked_stamp or self._tracked_stamp is None:
+            self._tracked_stamp = index_stamp
+            self._tracked = self.scanner.get_git_tracked_files(self.root)
+
+        # 4. Hygiene depends on the sensitive files, .gitignore and the git index only
+        hygiene_stamp = (self._stamp(".gitignore"), index_stamp)
+        if hygiene_stamp != self._hygiene_stamp or changed is None \
+                or any(sensitive_action(rel) for rel in changed):
+            self._hygiene_stamp = hygiene_stamp
+            self._hygiene = check_hygiene()
+
+    def _scan_tracked(self) -> List[ScanResult]:
+        results: List[ScanResult] = []
+        for rel in self._tracked:
+            full_path = os.path.join(self.root, rel)
+            if self.scanner._is_excluded(full_path, self.root):
+                continue
+            cached = self.index.get(rel)
+            if cached is None:
+                stamp = self._stamp(full_path)
+                if stamp is None:
+                    continue
+                self.scanner._found = []
+                self.scanner._scan_file(full_path)
+                cached = self.index[rel] = (stamp, self.scanner._found)
+                self.scanner._found = []
+            results.extend(cached[1])
+        return results
+
+    def _scan_staged(self) -> List[ScanResult]:
+        self.scanner._found = []
+        for _ in self.scanner._scan_staged(self.root):
+            pass
+        results, self.scanner._found = self.scanner._found, []
+        return results
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        command = request.get("command")
+        if command == "status":
+            return {
+                "root": self.root,
+                "watcher": self.watcher.name,
+                "indexed_files": len(self.index),
+                "tracked_files": len(self._tracked),
+                "requests": self.requests,
+                "uptime": round(time.time() - self.started, 1),
+            }
+        if command != "scan":
+            return {"error": f"unknown command: {command}"}
+
+        mode = request.get("mode", "default")
+        if mode not in ("default", "staged"):
+            return {"error": f"unsupported mode: {mode}"}
+        if request.get("root", self.root) != self.root:
+            return {"error": f"this daemon serves {self.root}"}
+        if request.get("rules") != self.rules:
+            return {"error": f"this daemon uses rules {self.rules or '(built-in)'}"}
+        self.requests += 1
+
+        self._refresh()
+        results = self._scan_staged() if mode == "staged" else self._scan_tracked()
+
+        hygiene_block, hygiene_messages = self._hygiene
+        should_block = hygiene_block
+        issues = []
+        for issue in results:
+            action = self.policy.get_action(issue.severity)
+            should_block = should_block or action == "BLOCK"
+            issues.append(finding_entry(issue, action))
+        return {"blocking": should_block, "hygiene": hygiene_messages, "issues": issues}
+
+    def serve(self, socket_path: str):
+        """Serves newline-delimited JSON requests until a 'shutdown' command."""
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = {}
+                if request.get("command") == "shutdown":
+                    self.wfile.write(b'{"stopping": true}\n')
+                    self.server._stop = True
+                    return
+                try:
+                    response = daemon.handle(request)
+                except Exception as e:  # a bad request must not kill the daemon
+                    response = {"error": f"{e.__class__.__name__}: {e}"}
+                self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+        if os.path.exists(socket_path):
+            if request_daemon(socket_path, {"command": "status"}) is not None:
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+            os.unlink(socket_path)
+
+        # The socket is created owner-only: no window between bind and chmod
+        umask = os.umask(0o077)
+        try:
+            server = socketserver.UnixStreamServer(socket_path, Handler)
+        finally:
+            os.umask(umask)
+        server._stop = False
+        os.chmod(socket_path, 0o600)
+        try:
+            while not server._stop:
+                server.handle_request()
+        finally:
+            server.server_close()
+            self.watcher.close()
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def request_daemon(socket_path: str, request: Dict[str, Any], timeout: float = 60.0) -> Optional[Dict[str, Any]]:
+    """Sends one request; returns None if no daemon is listening."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            data = b""
+            while not data.endswith(b"\n"):
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    break
+                data += chunk
+    except OSError:
+        return None
+    try:
+        return json.loads(data)
+    except ValueError:
+        return None
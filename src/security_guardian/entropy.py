@@ -0,0 +1,67 @@
+import math
+from collections import Counter
+from typing import Dict, Iterable, List
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the pure-Python path is the default
+    np = None
+
+# Shannon entropy (bits per char) above which a quoted string is reported
+ENTROPY_THRESHOLD = 4.5
+
+# log2 table for character counts; longer tokens fall back to math.log2
+_LOG2_SIZE = 4096
+_LOG2 = [0.0] + [math.log2(i) for i in range(1, _LOG2_SIZE)]
+
+# Tokens per NumPy histogram block (block x 256 counters)
+_NUMPY_BLOCK = 4096
+
+
+def _log2(n: int) -> float:
+    return _LOG2[n] if n < _LOG2_SIZE else math.log2(n)
+
+
+def shannon_entropy(text: str) -> float:
+    """
+    Shannon entropy of a string in bits per character, from a single-pass
+    character histogram: H = log2(n) - sum(c * log2(c)) / n.
+    """
+    n = len(text)
+    if not n:
+        return 0
+    return _log2(n) - sum(c * _log2(c) for c in Counter(text).values()) / n
+
+
+def _numpy_entropies(tokens: List[str]) -> List[float]:
+    """Byte-histogram entropies for ASCII tokens, one bincount per block."""
+    entropies: List[float] = []
+    for start in range(0, len(tokens), _NUMPY_BLOCK):
+        block = tokens[start:start + _NUMPY_BLOCK]
+        lengths = np.fromiter((len(t) for t in block), dtype=np.int64, count=len(block))
+        data = np.frombuffer("".join(block).encode("ascii"), dtype=np.uint8).astype(np.int64)
+        rows = np.repeat(np.arange(len(block), dtype=np.int64), lengths)
+        counts = np.bincount(rows * 256 + data, minlength=len(block) * 256).reshape(len(block), 256)
+        counts = counts.astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weighted = np.where(counts > 0, counts * np.log2(counts), 0.0).sum(axis=1)
+            values = np.log2(lengths) - weighted / lengths
+        entropies.extend(np.where(lengths > 0, values, 0.0).tolist())
+    return entropies
+
+
+def batch_entropy(tokens: Iterable[str]) -> Dict[str, float]:
+    """
+    Computes the entropy of many candidate tokens at once.
+    Repeated tokens (common in minified bundles) are only computed once; with
+    NumPy available, ASCII tokens are histogrammed in vectorised blocks.
+    """
+    unique = list(dict.fromkeys(tokens))
+    if np is not None and unique:
+        ascii_tokens = [t for t in unique if t.isascii()]
+        result = dict(zip(ascii_tokens, _numpy_entropies(ascii_tokens)))
+        for t in unique:
+            if t not in result:
+                result[t] = shannon_entropy(t)
+        return result
+    return {t: shannon_entropy(t) for t in unique}
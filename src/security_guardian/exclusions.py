@@ -0,0 +1,196 @@
+import logging
+import os
+import re
+from typing import Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_GLOB_CHARS = set("*?[")
+
+IGNORE_FILE = ".security-guardian-ignore"
+
+
+def _to_posix(path: str) -> str:
+    return path.replace(os.sep, "/") if os.sep != "/" else path
+
+
+def glob_to_regex(glob: str) -> str:
+    """
+    Translates a gitignore-style glob into a regex source: '*' and '?' stay
+    within one path component, '**' spans components, [...] classes are kept.
+    """
+    out: List[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i) and (i == 0 or glob[i - 1] == "/"):
+            # Leading or inner '**/': zero or more directories
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i) and i + 2 == n and (i == 0 or glob[i - 1] == "/"):
+            # Trailing '/**': everything inside
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = glob.find("]", i + 2 if glob.startswith("[!", i) or glob.startswith("[]", i) else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+            else:
+                body = glob[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end + 1
+        elif c == "\\" and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+
+class _PatternGroup:
+    """
+    One set of compiled exclusions. Plain names, '*.ext' globs and literal
+    paths go into hash sets; only the remaining globs share one regex.
+    """
+
+    def __init__(self):
+        self.names: Set[str] = set()
+        self.extensions: Set[str] = set()
+        self.paths: Set[str] = set()
+        self.name_globs: List[str] = []
+        self.path_globs: List[str] = []
+        self.name_regex: Optional[re.Pattern] = None
+        self.path_regex: Optional[re.Pattern] = None
+
+    def add(self, pattern: str, prefix: Optional[str] = None):
+        """Adds a name pattern, or a path pattern anchored below prefix."""
+        has_glob = any(c in _GLOB_CHARS for c in pattern) or "\\" in pattern
+        if prefix is not None:
+            if has_glob:
+                self.path_globs.append(re.escape(prefix) + glob_to_regex(pattern))
+            else:
+                self.paths.add(prefix + pattern)
+        elif not has_glob:
+            self.names.add(pattern)
+        elif pattern.startswith("*.") and not any(c in _GLOB_CHARS or c in ".\\" for c in pattern[2:]):
+            self.extensions.add(pattern[1:])
+        else:
+            self.name_globs.append(glob_to_regex(pattern))
+
+    def compile(self):
+        if self.name_globs:
+            self.name_regex = re.compile("|".join(f"(?:{g})" for g in self.name_globs), re.DOTALL)
+        if self.path_globs:
+            self.path_regex = re.compile("|".join(f"(?:{g})" for g in self.path_globs), re.DOTALL)
+
+    def match(self, path: str, name: str) -> bool:
+        if name in self.names:
+            return True
+        if self.extensions:
+            dot = name.rfind(".")
+            if dot > 0 and name[dot:] in self.extensions:
+                return True
+        if path in self.paths:
+            return True
+        if self.name_regex is not None and self.name_regex.fullmatch(name):
+            return True
+        return self.path_regex is not None and self.path_regex.fullmatch(path) is not None
+
+
+class ExclusionMatcher:
+    """
+    Exclusion patterns compiled once, with .gitignore semantics:
+      - a pattern without a slash ('env', '*.log') matches a file or
+        directory of that name at any depth, never part of a name
+        ('env' does not exclude 'environment.py')
+      - a pattern with a slash ('docs/*.md', '/build') is anchored to the
+        base directory (the working directory unless given)
+      - a trailing slash ('cache/') only matches directories
+      - '**' spans directories; '*', '?' and [...] stay within one component
+    Everything inside an excluded directory is excluded as well. Negated
+    patterns ('!keep.py') are not supported and are ignored with a warning.
+    """
+
+    def __init__(self, patterns: Iterable[str], base: Optional[str] = None):
+        base = _to_posix(os.path.abspath(base or os.getcwd())).rstrip("/")
+        self._any = _PatternGroup()
+        self._dirs = _PatternGroup()
+
+        for raw in patterns:
+            pattern = raw.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+            if pattern.startswith("!"):
+                logger.warning("Negated exclusion '%s' is not supported; ignoring it.", pattern)
+                continue
+
+            # 1. Directory-only patterns end with a slash
+            pattern = _to_posix(pattern)
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            if not pattern:
+                continue
+
+            # 2. Anchored patterns hold a slash; they are matched as absolute paths
+            group = self._dirs if dir_only else self._any
+            if pattern.startswith("**/") and "/" not in pattern[3:]:
+                group.add(pattern[3:])
+            elif os.path.isabs(pattern):
+                group.add(_to_posix(os.path.normpath(pattern)), prefix="")
+            elif "/" in pattern:
+                group.add(_to_posix(os.path.normpath(pattern.lstrip("/"))), prefix=base + "/")
+            else:
+                group.add(pattern)
+
+        self._any.compile()
+        self._dirs.compile()
+
+    def match_entry(self, path: str, is_dir: bool = False) -> bool:
+        """
+        Checks a single entry (absolute path) against the patterns, assuming
+        its parent directories were already checked, e.g. while walking.
+        """
+        path = _to_posix(path)
+        name = path.rpartition("/")[2]
+        if self._any.match(path, name):
+            return True
+        return is_dir and self._dirs.match(path, name)
+
+    def match(self, path: str, root: str, is_dir: bool = False) -> bool:
+        """
+        Checks a path and each of its parent directories below root (the
+        scan root; components above it never match).
+        """
+        relative = os.path.relpath(path, root)
+        if relative == ".":
+            return False
+        current = _to_posix(root).rstrip("/")
+        parts = _to_posix(relative).split("/")
+        last = len(parts) - 1
+        for i, part in enumerate(parts):
+            current = current + "/" + part
+            if self.match_entry(current, is_dir=is_dir or i < last):
+                return True
+        return False
+
+
+def load_ignore_file(path: str = IGNORE_FILE) -> List[str]:
+    """Reads exclusion patterns from an ignore file (missing file: none)."""
+    patterns = []
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(line)
+    return patterns
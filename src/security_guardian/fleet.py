@@ -0,0 +1,298 @@
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from . import __version__
+from .baseline import BASELINE_FILE, Baseline
+from .exclusions import IGNORE_FILE, ExclusionMatcher, load_ignore_file
+from .output import create_emitter, finding_entry
+from .policy import PolicyEngine
+from .rulepack import RulePackError, default_cache_dir
+from .scanner import SecretScanner
+
+# Bump when the checkpoint records change shape
+CHECKPOINT_FORMAT = 1
+
+
+def read_manifest(path: str) -> List[str]:
+    """
+    One repository (work tree or bare mirror) per line; blank lines and
+    '#' comments are skipped. Relative paths are relative to the manifest.
+    Returns absolute paths, without duplicates, in manifest order.
+    """
+    base = os.path.dirname(os.path.abspath(path))
+    repos: List[str] = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            repo = os.path.normpath(os.path.join(base, os.path.expanduser(line)))
+            if repo not in seen:
+                seen.add(repo)
+                repos.append(repo)
+    return repos
+
+
+def _git(repo: str, *args: str) -> Optional[str]:
+    """Output of a git command run in repo, or None if it fails."""
+    try:
+        result = subprocess.run(["git", "-C", repo] + list(args), capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def _digest(text: Optional[str]) -> Optional[str]:
+    return None if text is None else hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _content_state(repo: str, mode: str) -> Optional[str]:
+    """
+    What the scan of a mode reads beyond HEAD: every ref for history, and
+    the uncommitted edits to tracked files for a work tree.
+    """
+    if mode == "history":
+        return _digest(_git(repo, "for-each-ref", "--format=%(objectname) %(refname)"))
+    if mode == "default":
+        return _digest(_git(repo, "diff", "HEAD", "--binary", "--no-color", "--no-ext-diff"))
+    return None
+
+
+def _file_digest(path: str) -> Optional[str]:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class FleetCheckpoints:
+    """
+    One JSON record per repository (its findings and scan statistics), keyed
+    by everything that determines them: the repo's HEAD (plus its other refs
+    or uncommitted edits, where the scan reads them), the rules, the scan
+    options and the scanner version. A rerun, e.g. after an interrupted
+    nightly run, reuses every record whose key still matches.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @staticmethod
+    def key(repo: str, head: str, fingerprint: str, options: Dict[str, Any]) -> str:
+        payload = json.dumps({
+            "repo": repo, "head": head, "policy": fingerprint, "options": options,
+            "version": __version__, "format": CHECKPOINT_FORMAT,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, repo: str) -> str:
+        name = hashlib.sha256(repo.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, f"repo-{name}.json")
+
+    def get(self, repo: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(repo), "r", encoding="utf-8") as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record.get("key") != key:
+            return None
+        return record
+
+    def put(self, repo: str, record: Dict[str, Any]):
+        path = self._path(repo)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp, path)  # atomic: an interrupted run never leaves half a record
+        except OSError as e:
+            logging.warning(f"Fleet checkpoint update failed: {e}")
+
+
+def scan_repo(repo: str, policy: PolicyEngine, options: Dict[str, Any],
+              checkpoints: Optional[FleetCheckpoints] = None, fresh: bool = False) -> Dict[str, Any]:
+    """
+    Scans one repository: the tracked files of a work tree, the HEAD tree
+    of a bare mirror, or (with options["history"]) every blob in history.
+    The repository's ignore file and baseline apply, as for a scan run in it.
+    Returns its record: findings as report entries plus statistics, taken
+    from the checkpoint when it is still valid ("checkpoint": True).
+    """
+    start = time.perf_counter()
+    if not os.path.isdir(repo):
+        raise FileNotFoundError(f"No such directory: {repo}")
+
+    # 1. What to scan
+    bare = _git(repo, "rev-parse", "--is-bare-repository") == "true"
+    head = _git(repo, "rev-parse", "--verify", "-q", "HEAD")
+    if options["history"]:
+        mode, rev_range = "history", "--all"
+    elif bare:
+        mode, rev_range = "ref", "HEAD"
+    else:
+        mode, rev_range = "default", "--all"
+    exclude = list(options["exclude"]) + load_ignore_file(os.path.join(repo, IGNORE_FILE))
+    # The repository's own baseline, if it has one (a bad one fails the repo)
+    baseline_path = os.path.join(repo, BASELINE_FILE)
+    baseline = Baseline.load(baseline_path) if os.path.isfile(baseline_path) else None
+
+    # 2. Reuse the checkpoint (only for git repositories: HEAD, the refs
+    # and the uncommitted edits identify the content)
+    key = None
+    if checkpoints is not None and head is not None:
+        key = FleetCheckpoints.key(repo, head, policy.fingerprint, dict(
+            options, mode=mode, exclude=exclude, state=_content_state(repo, mode),
+            baseline=_file_digest(baseline_path) if baseline else None))
+        record = None if fresh else checkpoints.get(repo, key)
+        if record is not None:
+            record["checkpoint"] = True
+            return record
+
+    # 3. Scan; ignore file patterns are anchored to the repository
+    scanner = SecretScanner(policy, exclude_patterns=exclude, max_file_size=options["max_file_size"],
+                            file_timeout=options["file_timeout"], baseline=baseline)
+    scanner.exclusions = ExclusionMatcher(scanner.exclude_patterns, base=repo)
+    entries = []
+    blocking = False
+    for issue in scanner.iter_scan_path(repo, mode=mode, rev_range=rev_range):
+        action = policy.get_action(issue.severity)
+        blocking = blocking or action == "BLOCK"
+        entry = finding_entry(issue, action)
+        entry["repo"] = repo
+        entries.append(entry)
+
+    record = {
+        "key": key, "repo": repo, "mode": mode, "head": head,
+        "files": scanner.files_scanned, "skipped": dict(scanner.skipped), "partial": scanner.partial,
+        "suppressed": scanner.suppressed,
+        "blocking": blocking, "seconds": round(time.perf_counter() - start, 6), "entries": entries,
+    }
+    if key is not None:
+        checkpoints.put(repo, record)
+    record["checkpoint"] = False
+    return record
+
+
+# Process pool workers: the policy (rules analyzed, regexes compiled on first
+# use) is sent to each worker once and stays warm for every repository it scans
+_worker_policy = None
+_worker_options = None
+_worker_checkpoints = None
+_worker_fresh = False
+
+def _init_worker(policy: PolicyEngine, options: Dict[str, Any], checkpoint_dir: Optional[str], fresh: bool):
+    global _worker_policy, _worker_options, _worker_checkpoints, _worker_fresh
+    _worker_policy = policy
+    _worker_options = options
+    _worker_checkpoints = FleetCheckpoints(checkpoint_dir) if checkpoint_dir else None
+    _worker_fresh = fresh
+
+def _scan_repo_worker(repo: str) -> Dict[str, Any]:
+    try:
+        return scan_repo(repo, _worker_policy, _worker_options, _worker_checkpoints, _worker_fresh)
+    except Exception as e:
+        return {"repo": repo, "error": str(e) or type(e).__name__}
+
+
+def _scan_repos_serial(repos: List[str], policy: PolicyEngine, options: Dict[str, Any],
+                       checkpoint_dir: Optional[str], fresh: bool):
+    _init_worker(policy, options, checkpoint_dir, fresh)
+    for repo in repos:
+        yield _scan_repo_worker(repo)
+
+
+def _scan_repos_pool(repos: List[str], policy: PolicyEngine, options: Dict[str, Any],
+                     checkpoint_dir: Optional[str], fresh: bool, jobs: int):
+    """Yields the records in manifest order while the pool runs ahead."""
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                               initargs=(policy, options, checkpoint_dir, fresh))
+    try:
+        futures = [pool.submit(_scan_repo_worker, repo) for repo in repos]
+        for repo, future in zip(repos, futures):
+            try:
+                yield future.result()
+            except Exception as e:  # e.g. a worker killed by the OS
+                yield {"repo": repo, "error": str(e) or type(e).__name__}
+    finally:
+        # On an interrupt, queued repos are dropped: their checkpoints are simply missing
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def run_fleet(args):
+    # 1. Manifest and rules (analyzed once here, compiled once per worker)
+    try:
+        repos = read_manifest(args.manifest)
+    except OSError as e:
+        print(f"[ERROR] Cannot read manifest {args.manifest}: {e}")
+        sys.exit(1)
+    try:
+        policy = PolicyEngine(args.rules, cache_dir=args.cache_dir or default_cache_dir()) if args.rules else PolicyEngine()
+    except RulePackError as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    options = {
+        "history": args.history, "exclude": args.exclude,
+        "max_file_size": args.max_file_size, "file_timeout": args.file_timeout,
+    }
+    checkpoint_dir = None if args.no_checkpoints else (
+        args.checkpoint_dir or os.path.join(args.cache_dir or default_cache_dir(), "fleet"))
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    # 2. Scan, writing one consolidated report in manifest order
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    emitter = create_emitter(args.format, out, policy)
+    emitter.start()
+    start = time.perf_counter()
+    scanned = reused = failed = findings = 0
+    blocking = False
+    if jobs > 1 and len(repos) > 1:
+        records = _scan_repos_pool(repos, policy, options, checkpoint_dir, args.fresh, min(jobs, len(repos)))
+    else:
+        records = _scan_repos_serial(repos, policy, options, checkpoint_dir, args.fresh)
+    try:
+        for record in records:
+            if "error" in record:
+                failed += 1
+                print(f"[ERROR] {record['repo']}: {record['error']}", file=sys.stderr)
+                continue
+            for entry in record["entries"]:
+                emitter.emit(entry)
+            findings += len(record["entries"])
+            blocking = blocking or record["blocking"]
+            if record["checkpoint"]:
+                reused += 1
+            else:
+                scanned += 1
+            for path, reason in sorted(record["partial"].items()):
+                print(f"[WARN] Partially scanned {path}: {reason}", file=sys.stderr)
+            if args.verbose:
+                source = "checkpoint" if record["checkpoint"] else f"{record['seconds']:.2f}s"
+                print(f"[INFO] {record['repo']}: {len(record['entries'])} findings, "
+                      f"{record['files']} files ({source})", file=sys.stderr)
+    except KeyboardInterrupt:
+        records.close()
+        print("\n[INFO] Interrupted: finished repositories are checkpointed; rerun to resume.", file=sys.stderr)
+        sys.exit(130)
+    emitter.finish(blocking)
+    if args.output:
+        out.close()
+
+    # 3. Throughput
+    elapsed = time.perf_counter() - start
+    rate = len(repos) / (elapsed / 60) if elapsed > 0 else 0.0
+    print(f"[FLEET] {len(repos)} repos in {elapsed:.1f}s ({rate:.1f} repos/min): "
+          f"{scanned} scanned, {reused} from checkpoints, {failed} failed; {findings} findings", file=sys.stderr)
+
+    sys.exit(1 if blocking or failed else 0)
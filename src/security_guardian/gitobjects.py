@@ -0,0 +1,164 @@
+import re
+import subprocess
+from typing import Iterator, List, Optional, Tuple
+
+# Regular files only: symlinks (120000) and submodules (160000) hold no content to scan
+BLOB_MODES = {"100644", "100755"}
+
+_OBJECT_ID = re.compile(r"^[0-9a-f]{40}([0-9a-f]{24})?$")
+
+
+class CatFileBatch:
+    """
+    Reads objects from the git object store through one long-lived
+    `git cat-file --batch` process instead of one process per object.
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", "--batch"],
+            cwd=repo_path,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+
+    def read(self, object_id: str) -> Optional[Tuple[str, bytes]]:
+        """Returns (type, content) for an object, or None if it is missing."""
+        self._proc.stdin.write(object_id.encode("ascii") + b"\n")
+        self._proc.stdin.flush()
+
+        header = self._proc.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file --batch exited unexpectedly")
+        parts = header.split()
+        if len(parts) != 3:
+            # "<object> missing" / "<object> ambiguous"
+            return None
+
+        size = int(parts[2])
+        data = self._proc.stdout.read(size)
+        self._proc.stdout.read(1)  # trailing newline
+        return parts[1].decode("ascii"), data
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_nul_fields(stream, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Splits a byte stream on NUL without reading it all into memory."""
+    pending = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        pending += chunk
+        fields = pending.split(b"\0")
+        pending = fields.pop()
+        yield from fields
+    if pending:
+        yield pending
+
+
+def check_rev_range(rev_range: str) -> str:
+    """Returns rev_range, unless it starts with "-" (other than "--all")."""
+    if rev_range.startswith("-") and rev_range != "--all":
+        raise ValueError(f"Invalid revision range '{rev_range}': must not start with '-'")
+    return rev_range
+
+
+def iter_history_blobs(repo_path: str, rev_range: str = "--all", unique: bool = True) -> Iterator[Tuple[str, str, str]]:
+    """
+    Streams (commit, path, blob) for every file version added or modified in
+    the given revisions, oldest first. With unique, each blob is reported
+    only once, at the first commit and path that introduced it; callers
+    that filter by path pass unique=False and dedupe what they keep. Paths
+    are relative to repo_path, and history outside it is skipped.
+    Raises ValueError for a rev_range git would read as an option.
+    """
+    check_rev_range(rev_range)
+    args: List[str] = [
+        "git", "-c", "core.quotepath=off", "log", "--reverse", "--raw", "-z",
+        "--no-abbrev", "--no-renames", "--relative", "-m", "--format=%x00%H", rev_range, "--"
+    ]
+    proc = subprocess.Popen(args, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    seen = set()
+    commit = None
+    pending_meta = None
+    try:
+        for field in _iter_nul_fields(proc.stdout):
+            if pending_meta is not None:
+                # The field following a raw diff entry is its path
+                new_mode, blob, status = pending_meta
+                pending_meta = None
+                if status == "D" or new_mode not in BLOB_MODES or blob in seen:
+                    continue
+                if unique:
+                    seen.add(blob)
+                yield commit, field.decode("utf-8", errors="replace"), blob
+                continue
+
+            token = field.lstrip(b"\n").decode("ascii", errors="replace")
+            if token.startswith(":"):
+                # ":<old mode> <new mode> <old blob> <new blob> <status>"
+                meta = token[1:].split()
+                if len(meta) == 5:
+                    pending_meta = (meta[1], meta[3], meta[4][:1])
+            elif _OBJECT_ID.match(token):
+                commit = token
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def _iter_listing(args: List[str], repo_path: str) -> Iterator[Tuple[List[str], str]]:
+    """Runs a NUL-separated listing command and yields (meta fields, path) per record."""
+    proc = subprocess.Popen(args, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        for record in _iter_nul_fields(proc.stdout):
+            meta, sep, path = record.partition(b"\t")
+            if sep:
+                yield meta.decode("ascii", errors="replace").split(), path.decode("utf-8", errors="replace")
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+def iter_index_blobs(repo_path: str) -> Iterator[Tuple[Optional[str], str, str]]:
+    """
+    Streams (None, path, blob) for every regular file in the index, i.e.
+    exactly what the next commit would contain. Paths are relative to
+    repo_path; each stage of a conflicted path is listed.
+    """
+    # "<mode> <object> <stage>\t<path>"
+    for meta, path in _iter_listing(["git", "ls-files", "-s", "-z"], repo_path):
+        if len(meta) == 3 and meta[0] in BLOB_MODES:
+            yield None, path, meta[1]
+
+
+def iter_tree_blobs(repo_path: str, ref: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Streams (commit, path, blob) for every regular file in the tree of a
+    commit. Works without a checkout (e.g. bare CI mirrors).
+    """
+    commit = subprocess.run(
+        ["git", "rev-parse", "--verify", "--quiet", ref + "^{commit}"],
+        cwd=repo_path, capture_output=True, text=True
+    ).stdout.strip()
+    if not commit:
+        return
+    # "<mode> <type> <object>\t<path>"
+    for meta, path in _iter_listing(["git", "ls-tree", "-r", "-z", commit], repo_path):
+        if len(meta) == 3 and meta[0] in BLOB_MODES:
+            yield commit, path, meta[2]
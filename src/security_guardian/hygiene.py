@@ -1,59 +1,120 @@
+import fnmatch
 import os
 import subprocess
-from typing import Tuple, List
+from typing import Dict, List, Optional, Tuple
 
-def check_hygiene() -> Tuple[bool, List[str]]:
+# Files that must not be committed, by file name (glob) in any directory:
+# name -> action when the file is tracked by git
+SENSITIVE_FILES: Dict[str, str] = {
+    ".env": "BLOCK",
+    ".env.*": "BLOCK",
+    "secrets.yaml": "BLOCK",
+    "secrets.yml": "BLOCK",
+    "secrets.json": "BLOCK",
+    "id_rsa": "BLOCK",
+    "id_dsa": "BLOCK",
+    "id_ecdsa": "BLOCK",
+    "id_ed25519": "BLOCK",
+    "*.key": "BLOCK",
+    "*.p12": "BLOCK",
+    "*.pfx": "BLOCK",
+    "*.jks": "BLOCK",
+    "*.keystore": "BLOCK",
+    ".htpasswd": "BLOCK",
+    # Often a public certificate: the content scan catches private keys in it
+    "*.pem": "WARN",
+}
+# Templates meant to be committed
+SAFE_FILES = (".env.example", ".env.sample", ".env.template", ".env.dist")
+
+
+def sensitive_action(path: str) -> Optional[str]:
+    """The action for tracking the file at path, or None if it is not a sensitive file."""
+    name = os.path.basename(path)
+    if name in SAFE_FILES:
+        return None
+    for pattern, action in SENSITIVE_FILES.items():
+        if fnmatch.fnmatchcase(name, pattern):
+            return action
+    return None
+
+
+class HygieneCheck:
+    """
+    Checks that no sensitive file (see SENSITIVE_FILES) below root is
+    tracked by git (BLOCK, or WARN for *.pem) or lies around untracked
+    without being ignored (WARN).
+
+    One `git ls-files` call, limited to the sensitive names, lists both the
+    tracked files and the untracked ones that .gitignore does not exclude.
+    It starts when the check is created and runs alongside the scan;
+    result() collects it.
+    """
+
+    def __init__(self, root: str = "."):
+        self.root = root
+        pathspecs = [f":(glob)**/{pattern}" for pattern in SENSITIVE_FILES]
+        try:
+            self._proc = subprocess.Popen(
+                ["git", "-c", "core.quotepath=off", "ls-files", "-z", "-t",
+                 "--cached", "--others", "--exclude-standard", "--"] + pathspecs,
+                cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError:
+            self._proc = None
+
+    def _listing(self) -> Optional[List[Tuple[str, bool]]]:
+        """(path, tracked) for the sensitive files, or None outside git."""
+        if self._proc is None:
+            return None
+        output, _ = self._proc.communicate()
+        if self._proc.returncode != 0:
+            return None
+        files = []
+        for entry in output.decode("utf-8", errors="replace").split("\0"):
+            # "H path": in the index, "? path": untracked and not ignored
+            if len(entry) > 2:
+                files.append((entry[2:], entry[0] != "?"))
+        return files
+
+    def result(self) -> Tuple[bool, List[str]]:
+        """
+        Returns:
+            tuple: (should_block: bool, messages: List[str])
+        """
+        files = self._listing()
+        if files is None:
+            # Not a git repository: nothing is tracked, and nothing ignored
+            try:
+                names = sorted(os.listdir(self.root))
+            except OSError:
+                names = []
+            files = [(name, False) for name in names if os.path.isfile(os.path.join(self.root, name))]
+
+        messages = []
+        should_block = False
+        gitignore = os.path.exists(os.path.join(self.root, ".gitignore"))
+        for path, tracked in sorted(files):
+            action = sensitive_action(path)
+            if action is None:
+                continue
+            if tracked and action == "BLOCK":
+                messages.append(f"❌ [BLOCK] {path} file is TRACKED by git! (Real Leak Risk)")
+                should_block = True
+            elif tracked:
+                messages.append(f"⚠️ [WARN] {path} is TRACKED by git; make sure it holds no private key.")
+            elif not gitignore:
+                messages.append(f"⚠️ [WARN] {path} exists but .gitignore is MISSING.")
+            else:
+                messages.append(f"⚠️ [WARN] {path} exists but is NOT listed in .gitignore.")
+        return should_block, messages
+
+
+def check_hygiene(root: str = ".") -> Tuple[bool, List[str]]:
     """
-    Checks for git hygiene violations mainly focusing on .env files.
+    Checks for git hygiene violations: sensitive files (.env files, keys,
+    keystores, secrets files) that are tracked or not ignored.
     Returns:
         tuple: (should_block: bool, messages: List[str])
     """
-    messages = []
-    should_block = False
-    
-    env_path = ".env"
-    gitignore_path = ".gitignore"
-    
-    # RULE 1: .env NOT present -> Pass
-    if not os.path.exists(env_path):
-        return False, []
-
-    # Check if .env is tracked by git (RULE 5)
-    # git ls-files .env --error-unmatch
-    try:
-        # Use subprocess to check git tracking
-        # We redirect stderr to devnull to avoid noise if not tracked
-        subprocess.check_call(
-            ["git", "ls-files", "--error-unmatch", env_path], 
-            stdout=subprocess.DEVNULL, 
-            stderr=subprocess.DEVNULL
-        )
-        # If call succeeds, file IS tracked
-        messages.append("❌ [BLOCK] .env file is TRACKED by git! (Real Leak Risk)")
-        should_block = True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # File is NOT tracked (or git not present/error), continue to other checks
-        pass
-
-    if should_block:
-        return True, messages
-
-    # RULE 3: .env present BUT .gitignore missing -> WARN
-    if not os.path.exists(gitignore_path):
-        messages.append("⚠️ [WARN] .env exists but .gitignore is MISSING.")
-        return False, messages
-
-    # RULE 2 & 4: Check if .env is ignored
-    # git check-ignore -q .env
-    try:
-        subprocess.check_call(
-            ["git", "check-ignore", "-q", env_path],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL
-        )
-        # If succeeds, .env is ignored -> RULE 2 (Pass)
-        return False, []
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # If failed, .env is NOT ignored -> RULE 4 (Warn)
-        messages.append("⚠️ [WARN] .env exists but is NOT listed in .gitignore.")
-        return False, messages
+    return HygieneCheck(root).result()
@@ -0,0 +1,280 @@
+"""
+Literal anchor extraction for detection rules.
+
+Every rule is reduced to a small set of case-folded literals ("anchors")
+such that any text the rule matches must contain one of them (see
+fold_case). The anchors of all
+rules are then folded into a single trie-shaped regex, which lets the engine
+reject lines that cannot match any rule with one fast search. Lines that do
+pass it go through one LiteralMatcher pass to find which rules (and context
+keywords) are actually involved.
+"""
+import re
+from typing import Iterable, List, Optional, Set, Tuple
+
+try:
+    # Python 3.11+
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:
+    import sre_parse
+    import sre_constants
+
+try:
+    # Python 3.11+: lowercase char -> the other chars IGNORECASE equates with it
+    from re._casefix import _EXTRA_CASES
+    _CASE_CLASSES = [(c,) + others for c, others in _EXTRA_CASES.items()]
+except ImportError:
+    from sre_compile import _equivalences as _CASE_CLASSES
+
+# Caps that keep the literal expansion small
+MAX_ANCHOR_SET = 64
+MAX_CHARSET = 16
+MIN_ANCHOR_LEN = 3
+
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    _REPEATS.add(sre_constants.POSSESSIVE_REPEAT)
+
+EMPTY = frozenset({""})
+
+# IGNORECASE equates chars that str.lower() keeps apart (e.g. "ſ" and "s",
+# "ı" and "i"): each class maps to one of its members
+_FOLD = str.maketrans({chr(c): chr(min(cls)) for cls in _CASE_CLASSES for c in cls})
+# The one char whose str.lower() is two chars, where re lowers it to "i"
+_DOTTED_I = "\u0130"
+
+
+def fold_case(text: str) -> str:
+    """
+    Lower-cases text so that chars a (?i) rule treats as equal become equal
+    ("ſecret" -> "secret", "K" -> "k"). Keeps the length: offsets in the
+    folded text are offsets in the original.
+    """
+    if text.isascii():
+        return text.lower()
+    return text.replace(_DOTTED_I, "i").lower().translate(_FOLD)
+
+
+class LiteralInfo:
+    """
+    Literal facts about a parsed regex node: the exact strings it can match
+    (None when unbounded or too many), literals every match starts / ends
+    with, and a set of literals one of which every match contains.
+    """
+    __slots__ = ("exact", "prefix", "suffix", "required")
+
+    def __init__(self, exact=None, prefix=EMPTY, suffix=EMPTY, required=None):
+        self.exact = exact
+        self.prefix = exact if exact is not None else prefix
+        self.suffix = exact if exact is not None else suffix
+        self.required = required
+
+
+def _anchor_score(group) -> Tuple[int, int]:
+    # Prefer long anchors, then fewer alternatives
+    return (min(len(s) for s in group), -len(group))
+
+
+def _concat(left, right) -> Optional[Set[str]]:
+    if len(left) * len(right) > MAX_ANCHOR_SET:
+        return None
+    return {a + b for a in left for b in right}
+
+
+def _union(groups) -> Optional[Set[str]]:
+    merged: Set[str] = set()
+    for group in groups:
+        if group is None:
+            return None
+        merged |= group
+    if len(merged) > MAX_ANCHOR_SET:
+        return None
+    return merged
+
+
+def _charset_info(items) -> Optional[Set[str]]:
+    chars: Set[str] = set()
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            chars.add(fold_case(chr(av)))
+        elif op is sre_constants.RANGE:
+            low, high = av
+            if high - low >= MAX_CHARSET:
+                return None
+            chars.update(fold_case(chr(c)) for c in range(low, high + 1))
+        else:
+            # NEGATE, CATEGORY (\d, \w ...) and friends
+            return None
+        if len(chars) > MAX_CHARSET:
+            return None
+    return chars
+
+
+def _node_info(op, av) -> LiteralInfo:
+    if op is sre_constants.LITERAL:
+        return LiteralInfo(exact={fold_case(chr(av))})
+    if op in _ZERO_WIDTH:
+        return LiteralInfo(exact=set(EMPTY))
+    if op is sre_constants.IN:
+        return LiteralInfo(exact=_charset_info(av))
+    if op is sre_constants.SUBPATTERN:
+        return _sequence_info(av[-1])
+    if getattr(sre_constants, "ATOMIC_GROUP", None) is op:
+        return _sequence_info(av)
+    if op is sre_constants.BRANCH:
+        infos = [_sequence_info(alt) for alt in av[1]]
+        required = _union(
+            i.exact if i.exact is not None else i.required for i in infos
+        )
+        return LiteralInfo(
+            exact=_union(i.exact for i in infos),
+            prefix=_union(i.prefix for i in infos) or EMPTY,
+            suffix=_union(i.suffix for i in infos) or EMPTY,
+            required=required,
+        )
+    if op in _REPEATS:
+        low, high, sub = av
+        if low == 0:
+            return LiteralInfo()
+        info = _sequence_info(sub)
+        exact = None
+        if info.exact is not None and low == high:
+            exact = set(EMPTY)
+            for _ in range(low):
+                exact = _concat(exact, info.exact)
+                if exact is None:
+                    break
+        return LiteralInfo(
+            exact=exact,
+            prefix=info.prefix,
+            suffix=info.suffix,
+            required=info.exact if info.exact is not None else info.required,
+        )
+    return LiteralInfo()
+
+
+def _sequence_info(items) -> LiteralInfo:
+    run: Set[str] = set(EMPTY)
+    prefix = None
+    candidates: List[Set[str]] = []
+
+    for op, av in items:
+        info = _node_info(op, av)
+        if info.exact is not None:
+            joined = _concat(run, info.exact)
+            if joined is not None:
+                run = joined
+                continue
+            candidates.append(run)
+            if prefix is None:
+                prefix = run
+            run = set(info.exact)
+            continue
+
+        # The literal run so far is contiguous with the start of this node
+        joined = _concat(run, info.prefix)
+        candidates.append(joined if joined is not None else run)
+        if prefix is None:
+            prefix = joined if joined is not None else run
+        if info.required:
+            candidates.append(info.required)
+        run = set(info.suffix)
+
+    candidates.append(run)
+    candidates = [c for c in candidates if c and c != EMPTY]
+    required = max(candidates, key=_anchor_score) if candidates else None
+    if prefix is None:
+        return LiteralInfo(exact=run, required=required)
+    return LiteralInfo(prefix=prefix, suffix=run, required=required)
+
+
+def extract_anchors(regex: str) -> Optional[Tuple[str, ...]]:
+    """
+    Returns case-folded literals one of which every match of the regex contains,
+    or None if the regex has no usable literal anchor.
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except Exception:
+        return None
+
+    info = _sequence_info(list(parsed))
+    anchors = info.exact if info.exact is not None else info.required
+    if not anchors:
+        return None
+    if min(len(a) for a in anchors) < MIN_ANCHOR_LEN or any("\n" in a for a in anchors):
+        return None
+    return tuple(sorted(anchors))
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """
+    Builds a regex matching any of the words, factored as a prefix trie so
+    the regex engine only branches where the words actually differ.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        alternatives = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not alternatives:
+            return ""
+        if len(alternatives) == 1 and not terminal:
+            return alternatives[0]
+        body = "(?:" + "|".join(alternatives) + ")"
+        return body + "?" if terminal else body
+
+    return build(trie)
+
+
+class LiteralMatcher:
+    """
+    Reports which of many literals occur in a text. All of them are folded
+    into one trie regex, so the text is walked by re's C loop, not per
+    literal and not character by character in Python.
+
+    Each search reports the longest literal at the leftmost position left.
+    The literals inside it are implied (see _contains). A literal that
+    starts inside it and runs past its end is found by resuming the search
+    at the first such start (see _resume) instead of after the match.
+    """
+
+    def __init__(self, words: Iterable[str]):
+        self.words = list(words)
+        # The empty string occurs in every text
+        self._always = {i for i, w in enumerate(self.words) if not w}
+        literals = {w for w in self.words if w}
+        self._contains = {
+            w: tuple(i for i, other in enumerate(self.words) if other and other in w) for w in literals
+        }
+        self._resume = {}
+        for w in literals:
+            self._resume[w] = next(
+                (k for k in range(1, len(w))
+                 if any(len(other) > len(w) - k and other.startswith(w[k:]) for other in literals)),
+                len(w),
+            )
+        self._regex = re.compile(trie_regex(literals)) if literals else None
+
+    def find_ids(self, text: str) -> Set[int]:
+        """Returns the indices of all words occurring in the text."""
+        found = set(self._always)
+        if self._regex is None:
+            return found
+        search, contains, resume = self._regex.search, self._contains, self._resume
+        seen: Set[str] = set()
+        m = search(text)
+        while m is not None:
+            word = m.group()
+            if word not in seen:
+                seen.add(word)
+                found.update(contains[word])
+            m = search(text, m.start() + resume[word])
+        return found
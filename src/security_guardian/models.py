@@ -1,12 +1,17 @@
-from dataclasses import dataclass
+import os
+from array import array
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional, List
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 
 class Severity(str, Enum):
     HIGH = "HIGH"
     MEDIUM = "MEDIUM"
     LOW = "LOW"
 
+_SEVERITIES: List[Severity] = list(Severity)
+_SEVERITY_IDS: Dict[Severity, int] = {s: i for i, s in enumerate(_SEVERITIES)}
+
 @dataclass
 class ScanResult:
     file_path: str
@@ -16,10 +21,184 @@ class ScanResult:
     content_snippet: str
     remediation_suggestion: Optional[str] = None
     validation_status: str = "N/A"
+    commit: Optional[str] = None  # Set when the finding comes from git history
+    # (start, end) of the snippet in the decoded text of the file on disk, if
+    # the finding was read from there (lets ResultStore drop the copied line)
+    span: Optional[Tuple[int, int]] = field(default=None, repr=False, compare=False)
+    # Rule and matched text, hashed (see baseline.match_digest)
+    digest: Optional[str] = field(default=None, repr=False, compare=False)
+
+class _Interned:
+    """Append-only table storing each distinct value once."""
+
+    __slots__ = ("values", "ids")
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def id(self, value: Hashable) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+class ResultStore:
+    """
+    Column-oriented storage for large numbers of findings.
+    File paths, finding types, commits and validation statuses are interned;
+    a finding costs a few array slots instead of a ScanResult object. For
+    findings read from files on disk only the snippet's offsets are kept:
+    the line is re-read through `loader` when the finding is materialized
+    (iteration or indexing), i.e. when output is rendered.
+    Without a loader, snippets are stored (interned) as strings.
+    """
+
+    __slots__ = (
+        "_loader", "_paths", "_stamps", "_types", "_commits", "_statuses", "_snippets",
+        "_path", "_line", "_type", "_severity", "_commit", "_status", "_start", "_end",
+    )
+
+    def __init__(self, loader: Optional[Callable[[str], Optional[str]]] = None):
+        self._loader = loader
+        self._paths = _Interned()
+        # Per path: (mtime_ns, size) when its snippets are kept as offsets
+        self._stamps: List[Optional[Tuple[int, int]]] = []
+        self._types = _Interned()
+        self._commits = _Interned()
+        self._statuses = _Interned()
+        self._snippets = _Interned()
+
+        # One entry per finding; _start is -1 when _end indexes _snippets
+        self._path = array("I")
+        self._line = array("I")
+        self._type = array("I")
+        self._severity = array("B")
+        self._commit = array("I")
+        self._status = array("I")
+        self._start = array("q")
+        self._end = array("q")
+
+    @staticmethod
+    def _stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def add(self, result: ScanResult):
+        path_id = self._paths.id(result.file_path)
+        if path_id == len(self._stamps):
+            # First finding of this file: snippets become offsets if it can be re-read
+            offsets = result.span is not None and self._loader is not None
+            self._stamps.append(self._stamp(result.file_path) if offsets else None)
+
+        if result.span is not None and self._stamps[path_id] is not None:
+            start, end = result.span
+        else:
+            start, end = -1, self._snippets.id(result.content_snippet)
+
+        self._path.append(path_id)
+        self._line.append(result.line_number)
+        self._type.append(self._types.id(result.secret_type))
+        self._severity.append(_SEVERITY_IDS[Severity(result.severity)])
+        self._commit.append(self._commits.id(result.commit))
+        self._status.append(self._statuses.id(result.validation_status))
+        self._start.append(start)
+        self._end.append(end)
+
+    def extend(self, results: Iterable[ScanResult]):
+        for result in results:
+            self.add(result)
+
+    def __len__(self) -> int:
+        return len(self._line)
+
+    def __getitem__(self, index: int) -> ScanResult:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return self._materialize(index, [None])
+
+    def __iter__(self) -> Iterator[ScanResult]:
+        # Consecutive findings usually share a file: it is read once per run
+        source = [None]
+        for index in range(len(self)):
+            yield self._materialize(index, source)
+
+    def _materialize(self, index: int, source: list) -> ScanResult:
+        return ScanResult(
+            file_path=self._paths.values[self._path[index]],
+            line_number=self._line[index],
+            secret_type=self._types.values[self._type[index]],
+            severity=_SEVERITIES[self._severity[index]],
+            content_snippet=self._snippet(index, source),
+            validation_status=self._statuses.values[self._status[index]],
+            commit=self._commits.values[self._commit[index]],
+        )
+
+    def _snippet(self, index: int, source: list) -> str:
+        """source[0] holds the last file read: (path id, text, lines if stale)."""
+        start, end = self._start[index], self._end[index]
+        if start < 0:
+            return self._snippets.values[end]
+
+        path_id = self._path[index]
+        if source[0] is None or source[0][0] != path_id:
+            path = self._paths.values[path_id]
+            text = self._loader(path)
+            # Edited since the scan: fall back to the line at the same number
+            lines = text.split("\n") if text is not None and self._stamp(path) != self._stamps[path_id] else None
+            source[0] = (path_id, text, lines)
+
+        _, text, lines = source[0]
+        if text is None:
+            return ""
+        if lines is not None:
+            line = self._line[index] - 1
+            return lines[line].strip() if line < len(lines) else ""
+        return text[start:end]
+
+    @property
+    def files(self) -> List[str]:
+        """Distinct files with findings, in order of their first finding."""
+        return list(self._paths.values)
+
+    def severity_counts(self) -> Dict[Severity, int]:
+        """Findings per severity, without materializing them."""
+        counts = [0] * len(_SEVERITIES)
+        for severity in self._severity:
+            counts[severity] += 1
+        return {s: counts[i] for i, s in enumerate(_SEVERITIES)}
 
 @dataclass
 class ScanSummary:
     total_files: int
     total_issues: int
     blocking_violations: int
-    results: List[ScanResult]
+    results: ResultStore
+    # Files not scanned, per reason ("extension", "binary", "image", "too_large", ...)
+    skipped: Dict[str, int] = field(default_factory=dict)
+    # Files whose scan hit a time limit (findings up to that point are kept): path -> reason
+    partial: Dict[str, str] = field(default_factory=dict)
+    # Findings left out because the baseline lists them
+    suppressed: int = 0
+
+    @classmethod
+    def from_results(cls, results: ResultStore, total_files: int, blocking: Iterable[Severity],
+                     skipped: Optional[Dict[str, int]] = None,
+                     partial: Optional[Dict[str, str]] = None, suppressed: int = 0) -> "ScanSummary":
+        """Counts the findings of the given blocking severities."""
+        counts = results.severity_counts()
+        return cls(
+            total_files=total_files,
+            total_issues=len(results),
+            blocking_violations=sum(counts[Severity(s)] for s in set(blocking)),
+            results=results,
+            skipped=dict(skipped or {}),
+            partial=dict(partial or {}),
+            suppressed=suppressed,
+        )
@@ -0,0 +1,139 @@
+import json
+import os
+from typing import Any, Dict, Iterable, TextIO
+
+from . import __version__
+from .models import ScanResult
+from .policy import PolicyEngine
+
+# Output formats that write each finding as soon as it is produced
+STREAMING_FORMATS = ("ndjson", "sarif")
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"BLOCK": "error", "WARN": "warning", "LOG": "note"}
+ENTROPY_RULE = "High Entropy String"
+
+
+def rule_id(secret_type: str) -> str:
+    """Strips decorations such as ' (Context: prod)' or ' (4.73)' from a finding type."""
+    return secret_type.split(" (", 1)[0]
+
+
+def finding_entry(issue: ScanResult, action: str) -> Dict[str, Any]:
+    """The report record of a finding (shared by every output format)."""
+    entry = {
+        "file": issue.file_path,
+        "line": issue.line_number,
+        "type": issue.secret_type,
+        "severity": issue.severity.value,
+        "action": action,
+        "content": issue.content_snippet,
+        "validation": issue.validation_status
+    }
+    if issue.commit:
+        entry["commit"] = issue.commit
+    return entry
+
+
+def write_json_report(stream: TextIO, blocking: bool, entries: Iterable[Dict[str, Any]]):
+    """
+    Writes the same document as json.dumps({"blocking", "issues"}, indent=2),
+    one finding at a time, so the report never holds every entry at once.
+    """
+    stream.write('{\n  "blocking": ' + json.dumps(blocking) + ',\n  "issues": [')
+    count = 0
+    for entry in entries:
+        stream.write(("," if count else "") + "\n    " + json.dumps(entry, indent=2).replace("\n", "\n    "))
+        count += 1
+    stream.write("\n  ]\n}\n" if count else "]\n}\n")
+
+
+class NdjsonEmitter:
+    """
+    Writes one JSON object per line for every finding, followed by a final
+    summary line.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.count = 0
+
+    def start(self):
+        pass
+
+    def emit(self, entry: Dict[str, Any]):
+        self.stream.write(json.dumps(entry) + "\n")
+        self.stream.flush()
+        self.count += 1
+
+    def finish(self, blocking: bool):
+        self.emit({"summary": {"blocking": blocking, "total_issues": self.count}})
+
+
+class SarifEmitter:
+    """
+    Writes a SARIF 2.1.0 log incrementally: the header (tool and rules) up
+    front, then each result as it is produced, then the closing brackets.
+    """
+
+    def __init__(self, stream: TextIO, policy: PolicyEngine):
+        self.stream = stream
+        self.policy = policy
+        self.count = 0
+
+    def start(self):
+        rules = [{"id": p["name"], "name": p["name"]} for p in self.policy.patterns]
+        rules.append({"id": ENTROPY_RULE, "name": ENTROPY_RULE})
+        driver = {
+            "name": "security-guardian",
+            "version": __version__,
+            "rules": rules,
+        }
+        # Leave the results array open so findings can be appended one by one
+        self.stream.write(
+            '{"$schema": ' + json.dumps(SARIF_SCHEMA) + ', "version": "2.1.0", '
+            '"runs": [{"tool": {"driver": ' + json.dumps(driver) + '}, "results": [\n'
+        )
+        self.stream.flush()
+
+    def emit(self, entry: Dict[str, Any]):
+        uri = entry["file"]
+        try:
+            relative = os.path.relpath(uri)
+            if not relative.startswith(".."):
+                uri = relative
+        except ValueError:
+            # Different drive on Windows
+            pass
+        result = {
+            "ruleId": rule_id(entry["type"]),
+            "level": SARIF_LEVELS.get(entry["action"], "note"),
+            "message": {"text": entry["type"]},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": uri.replace(os.sep, "/")},
+                    "region": {
+                        "startLine": entry["line"],
+                        "snippet": {"text": entry["content"]},
+                    },
+                }
+            }],
+            "properties": {
+                key: entry[key] for key in ("severity", "action", "validation", "commit", "repo") if key in entry
+            },
+        }
+        if self.count:
+            self.stream.write(",\n")
+        self.stream.write(json.dumps(result))
+        self.stream.flush()
+        self.count += 1
+
+    def finish(self, blocking: bool):
+        self.stream.write('\n], "properties": ' + json.dumps({"blocking": blocking}) + "}]}\n")
+        self.stream.flush()
+
+
+def create_emitter(output_format: str, stream: TextIO, policy: PolicyEngine):
+    if output_format == "sarif":
+        return SarifEmitter(stream, policy)
+    return NdjsonEmitter(stream)
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set, Tuple
 from .models import Severity
 
 # Hardcoded defaults (batteries-included)
@@ -34,32 +34,207 @@ DEFAULT_PATTERNS = [
 ]
 
 import re
+import json
+import hashlib
 import logging
+from .literals import LiteralMatcher, extract_anchors, fold_case, trie_regex
+from .safety import regex_risks
+from .rulepack import (DEFAULT_SEVERITY_ACTIONS, Rule, RulePackCache, parse_rule_pack,
+                       read_rule_pack, validate_rule_pack)
 
 class PolicyEngine:
     """
     Manages rules for detection and severity.
     """
-    def __init__(self, config_path: str = None):
-        self.patterns = DEFAULT_PATTERNS
-        self.context_keywords = DEFAULT_CONTEXT_KEYWORDS
-        # Future: Load from config_path if provided
-        
-        # Pre-compile regexes
-        for p in self.patterns:
-            try:
-                p["compiled"] = re.compile(p["regex"])
-            except re.error as e:
-                logging.error(f"Invalid regex for {p['name']}: {e}")
-                p["compiled"] = None
-    
+    def __init__(self, config_path: str = None, cache_dir: str = None):
+        """
+        config_path: optional rule pack (JSON or TOML) replacing or, with
+        include_defaults, extending the built-in rules. With cache_dir the
+        analyzed pack is cached there and its regexes compile lazily.
+        """
+        self.severity_actions = dict(DEFAULT_SEVERITY_ACTIONS)
+        prefilter_source = None
+
+        if config_path:
+            pack = self._load_rule_pack(config_path, cache_dir)
+            self.patterns = [
+                Rule(p, severity=Severity(p["severity"]),
+                     anchors=tuple(p["anchors"]) if p["anchors"] is not None else None)
+                for p in pack["patterns"]
+            ]
+            self.context_keywords = pack["context_keywords"]
+            self.severity_actions.update(pack["severity_actions"])
+            prefilter_source = pack["prefilter"]
+        else:
+            self.patterns = [Rule(p) for p in DEFAULT_PATTERNS]
+            self.context_keywords = DEFAULT_CONTEXT_KEYWORDS
+
+            # Pre-compile regexes
+            for p in self.patterns:
+                try:
+                    p["compiled"] = re.compile(p["regex"])
+                except re.error as e:
+                    logging.error(f"Invalid regex for {p['name']}: {e}")
+                    p["compiled"] = None
+
+        # Single-pass matcher: one prefilter over the literal anchors of all rules,
+        # then one literal pass over lines that pass it. Rule pack regexes
+        # were validated on load and compile on first use.
+        self.rules = [p for p in self.patterns if "compiled" not in p or p["compiled"] is not None]
+        if not config_path:
+            prefilter_source = self._analyze(self.rules)
+        # Rules that may backtrack catastrophically: their searches are time-limited
+        self.risky = [p for p in self.rules if p.get("risks")]
+        for p in self.risky:
+            logging.warning(f"Rule '{p['name']}' may backtrack catastrophically ({', '.join(p['risks'])})")
+        self.prefilter = None
+        self._build_prefilter(prefilter_source)
+        self._build_literal_matcher()
+
+    @staticmethod
+    def _analyze(patterns: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Extracts each rule's literal anchors and backtracking risks; returns
+        the prefilter source.
+        """
+        anchors = set()
+        for p in patterns:
+            p["anchors"] = extract_anchors(p["regex"])
+            p["risks"] = regex_risks(p["regex"])
+            if p["anchors"] is not None:
+                anchors.update(p["anchors"])
+        return trie_regex(anchors) if anchors else None
+
+    def _load_rule_pack(self, config_path: str, cache_dir: Optional[str]) -> Dict[str, Any]:
+        """
+        Reads, validates and analyzes a rule pack, or takes the analyzed form
+        from the cache when the pack's bytes are unchanged.
+        """
+        raw = read_rule_pack(config_path)
+        cache = RulePackCache(cache_dir) if cache_dir else None
+        key = RulePackCache.key(raw)
+        pack = cache.get(key) if cache else None
+        if pack is None:
+            pack = validate_rule_pack(parse_rule_pack(config_path, raw), DEFAULT_PATTERNS,
+                                      DEFAULT_CONTEXT_KEYWORDS, source=config_path)
+            pack["prefilter"] = self._analyze(pack["patterns"])
+            if cache:
+                cache.put(key, pack)
+        return pack
+
+    def _build_prefilter(self, source: Optional[str]):
+        """
+        Folds the literal anchors of every rule into one trie regex, so that a
+        line without any anchor costs a single search regardless of the rule
+        count. Rules without a usable anchor are always evaluated.
+        """
+        self.unanchored = [p for p in self.rules if p["anchors"] is None]
+        # Their buffer-wide form: ^ and $ must match at every line, and rules
+        # using \A or \Z (a line's start or end) can only be run per line
+        self.buffer_unanchored = []
+        self.per_line_unanchored = False
+        for p in self.unanchored:
+            if "\\A" in p["regex"] or "\\Z" in p["regex"]:
+                self.per_line_unanchored = True
+            elif "^" in p["regex"] or "$" in p["regex"]:
+                multiline = Rule({k: v for k, v in p.items() if k != "compiled"}, regex="(?m)" + p["regex"])
+                self.buffer_unanchored.append(multiline)
+            else:
+                self.buffer_unanchored.append(p)
+        if source:
+            self.prefilter = re.compile(source)
+
+    def _build_literal_matcher(self):
+        """
+        Compiles the rule anchors and context keywords into one LiteralMatcher,
+        mapping every distinct literal back to its rules/keywords.
+        """
+        targets: Dict[str, Tuple[List[int], List[int]]] = {}
+        for idx, p in enumerate(self.rules):
+            for anchor in p["anchors"] or ():
+                targets.setdefault(anchor, ([], []))[0].append(idx)
+        for idx, kw in enumerate(self.context_keywords):
+            targets.setdefault(kw.lower(), ([], []))[1].append(idx)
+
+        self._literal_targets = list(targets.values())
+        self.literals = LiteralMatcher(targets)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Stable hash of everything in the policy that influences findings.
+        """
+        payload = json.dumps({
+            "patterns": [[p["name"], p["regex"], Severity(p["severity"]).value] for p in self.patterns],
+            "context_keywords": list(self.context_keywords),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _scan_literals(self, folded: str) -> Tuple[Set[int], Set[int]]:
+        """
+        One literal pass over a case-folded line: returns the indices of the
+        rules whose anchors occur and of the context keywords that occur.
+        Context keywords are plain lower-case substrings: pass the line's
+        str.lower() to look them up.
+        """
+        rule_ids: Set[int] = set()
+        keyword_ids: Set[int] = set()
+        for word_id in self.literals.find_ids(folded):
+            rules, keywords = self._literal_targets[word_id]
+            rule_ids.update(rules)
+            keyword_ids.update(keywords)
+        return rule_ids, keyword_ids
+
+    def context_keyword(self, line: str) -> Optional[str]:
+        """The first context keyword (in keyword order) the line contains, if any."""
+        _, keyword_ids = self._scan_literals(line.lower())
+        return self.context_keywords[min(keyword_ids)] if keyword_ids else None
+
+    def match_line(self, line: str, profiler=None, guard=None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Returns the patterns matching the line (in rule order) and the first
+        context keyword (in keyword order) the line contains, if any.
+        With a per-rule ScanProfiler, every rule search is timed through it;
+        with a safety.TimeBudget (guard), risky rules are searched within
+        its rule time limit.
+        """
+        found, keyword = self.search_line(line, profiler, guard)
+        return [p for p, _ in found], keyword
+
+    def search_line(self, line: str, profiler=None, guard=None) -> Tuple[List[Tuple[Dict[str, Any], Any]], Optional[str]]:
+        """match_line, returning (pattern, match object) pairs."""
+        folded = fold_case(line)
+        keyword_ids = None
+        if self.prefilter is None or self.prefilter.search(folded) is None:
+            # No anchor at all: the common case skips the literal pass entirely
+            candidates = self.unanchored
+        else:
+            rule_ids, keyword_ids = self._scan_literals(folded)
+            candidates = [
+                p for idx, p in enumerate(self.rules)
+                if p["anchors"] is None or idx in rule_ids
+            ]
+
+        if guard is not None:
+            found = [(p, guard.search(p, line, profiler=profiler)) for p in candidates]
+        elif profiler is None or not profiler.per_rule:
+            found = [(p, p["compiled"].search(line)) for p in candidates]
+        else:
+            found = [(p, profiler.search(p, line)) for p in candidates]
+        matched = [(p, m) for p, m in found if m is not None]
+        if not matched:
+            return matched, None
+
+        if keyword_ids is None or not line.isascii():
+            # Outside ASCII, folding may differ from lower-casing
+            _, keyword_ids = self._scan_literals(line.lower())
+        keyword = self.context_keywords[min(keyword_ids)] if keyword_ids else None
+        return matched, keyword
+
     def get_action(self, severity: Severity) -> str:
         """
         Returns BLOCK, WARN, or LOG based on severity.
         """
-        # Default Enterprise Policy
-        if severity == Severity.HIGH:
-            return "BLOCK"
-        elif severity == Severity.MEDIUM:
-            return "WARN"
-        return "LOG"
+        # Default Enterprise Policy (HIGH: BLOCK, MEDIUM: WARN, LOW: LOG),
+        # overridable per rule pack
+        return self.severity_actions.get(Severity(severity).value, "LOG")
@@ -0,0 +1,123 @@
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class RuleStats:
+    calls: int = 0
+    matches: int = 0
+    seconds: float = 0.0
+
+
+class ScanProfiler:
+    """
+    Accumulates wall-clock time per scan phase (enumeration, hygiene,
+    binary_check, read, regex, entropy, output) and, with per_rule, the
+    time, calls and matches of every rule search.
+
+    Callback API: on_phase(name, seconds) is called when a phase ends and
+    on_rule(name, seconds, matched) after each rule search, in the process
+    where they happen (with --jobs, worker totals are merged afterwards
+    without callbacks).
+    """
+
+    def __init__(self, per_rule: bool = True,
+                 on_phase: Optional[Callable[[str, float], None]] = None,
+                 on_rule: Optional[Callable[[str, float, bool], None]] = None):
+        self.per_rule = per_rule
+        self.on_phase = on_phase
+        self.on_rule = on_rule
+        self.phases: Dict[str, float] = defaultdict(float)
+        self.rules: Dict[str, RuleStats] = defaultdict(RuleStats)
+
+    def __getstate__(self):
+        # Sent to and from pool workers: callbacks stay in the parent
+        state = self.__dict__.copy()
+        state["on_phase"] = state["on_rule"] = None
+        return state
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self.phases[name] += seconds
+            if self.on_phase is not None:
+                self.on_phase(name, seconds)
+
+    def search(self, rule: Dict[str, Any], text: str, pos: int = 0):
+        """rule["compiled"].search(text, pos), timed and counted for the rule."""
+        compiled = rule["compiled"]  # a lazy compile is not part of the search time
+        start = time.perf_counter()
+        match = compiled.search(text, pos)
+        seconds = time.perf_counter() - start
+        stats = self.rules[rule["name"]]
+        stats.calls += 1
+        stats.seconds += seconds
+        if match is not None:
+            stats.matches += 1
+        if self.on_rule is not None:
+            self.on_rule(rule["name"], seconds, match is not None)
+        return match
+
+    def merge(self, other: "ScanProfiler"):
+        """Adds the totals of another profiler (e.g. a pool worker's)."""
+        for name, seconds in other.phases.items():
+            self.phases[name] += seconds
+        for name, theirs in other.rules.items():
+            ours = self.rules[name]
+            ours.calls += theirs.calls
+            ours.matches += theirs.matches
+            ours.seconds += theirs.seconds
+
+    def report(self) -> Dict[str, float]:
+        return {name: round(seconds, 6) for name, seconds in sorted(self.phases.items())}
+
+    def rule_report(self, patterns: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+        """
+        Per-rule totals, slowest first. Rules of patterns that never ran
+        (e.g. their anchors never occurred) are listed with zero calls.
+        """
+        names = list(self.rules)
+        for p in patterns or []:
+            if p["name"] not in self.rules:
+                names.append(p["name"])
+        rows = []
+        for name in names:
+            stats = self.rules.get(name, RuleStats())
+            rows.append({
+                "rule": name,
+                "seconds": round(stats.seconds, 6),
+                "calls": stats.calls,
+                "matches": stats.matches,
+                "us_per_call": round(stats.seconds / stats.calls * 1e6, 2) if stats.calls else 0.0,
+            })
+        rows.sort(key=lambda row: row["seconds"], reverse=True)
+        return rows
+
+    def format(self, patterns: Optional[List[Dict[str, Any]]] = None, top: int = 20) -> List[str]:
+        """The --profile report as text lines."""
+        lines = ["[PROFILE] Time per phase:"]
+        for name, seconds in sorted(self.phases.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"   {name + ':':<14}{seconds:.3f}s")
+        if self.per_rule:
+            rows = self.rule_report(patterns)
+            lines.append(f"[PROFILE] Rules by search time (top {min(top, len(rows))} of {len(rows)}):")
+            width = max([len(row["rule"]) for row in rows[:top]] + [4])
+            lines.append(f"   {'Rule':<{width}}  {'Time':>9}  {'Calls':>9}  {'Matches':>7}  {'us/call':>8}")
+            for row in rows[:top]:
+                lines.append(f"   {row['rule']:<{width}}  {row['seconds']:>8.3f}s  {row['calls']:>9}  "
+                             f"{row['matches']:>7}  {row['us_per_call']:>8.2f}")
+        return lines
+
+
+def timed(profiler: Optional[ScanProfiler], name: str):
+    """profiler.phase(name), or a no-op without a profiler."""
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(name)
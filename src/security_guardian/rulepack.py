@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+
+from . import __version__
+from .models import Severity
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: TOML packs need the optional 'tomli' package
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+ACTIONS = ("BLOCK", "WARN", "LOG")
+DEFAULT_SEVERITY_ACTIONS = {"HIGH": "BLOCK", "MEDIUM": "WARN", "LOW": "LOG"}
+
+# Bump when the cached form changes shape
+CACHE_FORMAT = 3
+
+
+class RulePackError(ValueError):
+    """A rule pack that cannot be read or does not validate."""
+
+
+class Rule(dict):
+    """
+    A pattern definition whose regex is compiled on first use: rules whose
+    anchors never occur in the scanned text are never compiled at all.
+    """
+
+    def __missing__(self, key):
+        if key != "compiled":
+            raise KeyError(key)
+        compiled = self["compiled"] = re.compile(self["regex"])
+        return compiled
+
+
+def default_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "security-guardian")
+
+
+def read_rule_pack(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError as e:
+        raise RulePackError(f"Cannot read rule pack {path}: {e}")
+
+
+def parse_rule_pack(path: str, raw: bytes) -> Dict[str, Any]:
+    """Parses JSON or TOML (by file extension)."""
+    if path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise RulePackError("TOML rule packs need Python 3.11+ or the 'tomli' package.")
+        try:
+            return tomllib.loads(raw.decode("utf-8"))
+        except (UnicodeDecodeError, tomllib.TOMLDecodeError) as e:
+            raise RulePackError(f"{path}: invalid TOML: {e}")
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise RulePackError(f"{path}: invalid JSON: {e}")
+
+
+def validate_rule_pack(data: Any, defaults: List[Dict[str, Any]], default_keywords: List[str],
+                       source: str = "rule pack") -> Dict[str, Any]:
+    """
+    Checks a parsed pack and returns its normalized form:
+    {"patterns": [{"name", "regex", "severity"}], "context_keywords": [...],
+     "severity_actions": {...}}. All problems are reported at once.
+    With "include_defaults": true the pack extends the built-in rules
+    (a pack rule with the same name replaces the built-in one).
+    """
+    errors: List[str] = []
+    if not isinstance(data, dict):
+        raise RulePackError(f"{source}: expected a table/object at the top level")
+
+    patterns = data.get("patterns", [])
+    if not isinstance(patterns, list):
+        errors.append("'patterns' must be a list")
+        patterns = []
+
+    normalized: List[Dict[str, Any]] = []
+    seen = set()
+    for i, p in enumerate(patterns):
+        where = f"patterns[{i}]"
+        if not isinstance(p, dict):
+            errors.append(f"{where}: expected a table/object")
+            continue
+        name, regex, severity = p.get("name"), p.get("regex"), p.get("severity", "LOW")
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{where}: 'name' must be a non-empty string")
+        elif name in seen:
+            errors.append(f"{where}: duplicate rule name '{name}'")
+        else:
+            seen.add(name)
+            where = f"rule '{name}'"
+        if not isinstance(regex, str) or not regex:
+            errors.append(f"{where}: 'regex' must be a non-empty string")
+        else:
+            try:
+                re.compile(regex)
+            except re.error as e:
+                errors.append(f"{where}: invalid regex: {e}")
+        if severity not in Severity.__members__:
+            errors.append(f"{where}: 'severity' must be one of {', '.join(Severity.__members__)}")
+        normalized.append({"name": name, "regex": regex, "severity": severity})
+
+    keywords = data.get("context_keywords", default_keywords)
+    if not isinstance(keywords, list) or not all(isinstance(k, str) and k for k in keywords):
+        errors.append("'context_keywords' must be a list of non-empty strings")
+        keywords = []
+
+    actions = dict(DEFAULT_SEVERITY_ACTIONS)
+    overrides = data.get("severity_actions", {})
+    if not isinstance(overrides, dict):
+        errors.append("'severity_actions' must be a table/object")
+        overrides = {}
+    for severity, action in overrides.items():
+        if severity not in Severity.__members__ or action not in ACTIONS:
+            errors.append(f"severity_actions: '{severity} = {action}' is not SEVERITY = {'|'.join(ACTIONS)}")
+        else:
+            actions[severity] = action
+
+    include_defaults = data.get("include_defaults", False)
+    if not isinstance(include_defaults, bool):
+        errors.append("'include_defaults' must be true or false")
+    elif include_defaults:
+        own = {p["name"] for p in normalized}
+        normalized = [
+            {"name": p["name"], "regex": p["regex"], "severity": Severity(p["severity"]).value}
+            for p in defaults if p["name"] not in own
+        ] + normalized
+    elif not normalized:
+        errors.append("no patterns (set 'include_defaults = true' to extend the built-in rules)")
+
+    if errors:
+        raise RulePackError(f"{source}: " + "; ".join(errors))
+    return {"patterns": normalized, "context_keywords": keywords, "severity_actions": actions}
+
+
+class RulePackCache:
+    """
+    Stores analyzed rule packs (normalized rules plus their literal anchors,
+    backtracking risks and the prefilter source) as JSON, keyed by the hash
+    of the pack's bytes and the scanner version. A cache hit skips parsing,
+    validation and rule analysis; with lazy Rule compilation, startup no
+    longer compiles every regex of a large pack.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def key(raw: bytes) -> str:
+        h = hashlib.sha256(f"{__version__}:{CACHE_FORMAT}:".encode("utf-8"))
+        h.update(raw)
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"rules-{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                compiled = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if compiled.get("key") != key:
+            return None
+        return compiled
+
+    def put(self, key: str, compiled: Dict[str, Any]):
+        path = self._path(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(dict(compiled, key=key), f)
+            os.replace(tmp, path)  # atomic: concurrent hooks never read half a file
+        except OSError as e:
+            logging.warning(f"Rule pack cache update failed: {e}")
@@ -0,0 +1,334 @@
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+MAXREPEAT = sre_parse.MAXREPEAT
+_IGNORECASE = 2  # re.IGNORECASE
+
+# Searches of a risky rule are stopped after this many seconds (per line)
+DEFAULT_RULE_TIMEOUT = 1.0
+
+# Character classes, approximated by their ASCII members
+_CATEGORIES = {
+    "CATEGORY_DIGIT": frozenset(range(ord("0"), ord("9") + 1)),
+    "CATEGORY_SPACE": frozenset(map(ord, " \t\n\r\f\v")),
+    "CATEGORY_WORD": frozenset(map(ord, "_0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ")),
+}
+# Wider ranges are treated like '.': they overlap with anything
+_MAX_RANGE = 512
+
+# Risk descriptions, as reported by regex_risks()
+NESTED = "nested quantifiers"
+AMBIGUOUS = "overlapping alternatives under a quantifier"
+ADJACENT = "adjacent quantifiers over overlapping characters"
+
+
+def _op(item) -> str:
+    return str(item[0])
+
+
+# A character set: (negated, chars). (True, frozenset()) is any character.
+_ANY = (True, frozenset())
+_NONE = (False, frozenset())
+
+
+def _union(a: Tuple[bool, FrozenSet[int]], b: Tuple[bool, FrozenSet[int]]) -> Tuple[bool, FrozenSet[int]]:
+    if not a[0] and not b[0]:
+        return False, a[1] | b[1]
+    if a[0] and b[0]:
+        return True, a[1] & b[1]
+    negated, positive = (a, b) if a[0] else (b, a)
+    return True, negated[1] - positive[1]
+
+
+def _overlap(a: Tuple[bool, FrozenSet[int]], b: Tuple[bool, FrozenSet[int]]) -> bool:
+    if a[0] and b[0]:
+        return True
+    if a[0] or b[0]:
+        negated, positive = (a, b) if a[0] else (b, a)
+        return bool(positive[1] - negated[1])
+    return not a[1].isdisjoint(b[1])
+
+
+def _chars(op: str, av: Any, ignorecase: bool) -> Tuple[bool, FrozenSet[int]]:
+    """The characters one item can match (approximated: wide ranges match any)."""
+    if op == "LITERAL":
+        chars = (False, frozenset([av]))
+    elif op == "NOT_LITERAL":
+        chars = (True, frozenset([av]))
+    elif op == "IN":
+        chars, negate = _NONE, False
+        for item_op, item_av in av:
+            item_op = str(item_op)
+            if item_op == "NEGATE":
+                negate = True
+            elif item_op == "LITERAL":
+                chars = _union(chars, (False, frozenset([item_av])))
+            elif item_op == "RANGE" and item_av[1] - item_av[0] <= _MAX_RANGE:
+                chars = _union(chars, (False, frozenset(range(item_av[0], item_av[1] + 1))))
+            elif item_op == "CATEGORY" and str(item_av) in _CATEGORIES:
+                chars = _union(chars, (False, _CATEGORIES[str(item_av)]))
+            elif item_op == "CATEGORY" and str(item_av).replace("_NOT", "") in _CATEGORIES:
+                chars = _union(chars, (True, _CATEGORIES[str(item_av).replace("_NOT", "")]))
+            else:
+                chars = _ANY
+        if negate:
+            chars = (not chars[0], chars[1])
+    else:
+        return _ANY  # ANY, ...
+    if ignorecase:
+        return chars[0], frozenset(ord(ch) for c in chars[1] for ch in (chr(c), chr(c).lower(), chr(c).upper())
+                                   if len(ch) == 1)
+    return chars
+
+
+def _is_repeat(op: str) -> bool:
+    # Possessive repeats never backtrack into their body
+    return op in ("MAX_REPEAT", "MIN_REPEAT")
+
+
+def _body(op: str, av: Any) -> List[list]:
+    """The sub-sequences directly inside an item."""
+    if op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+        return [av[2]]
+    if op == "SUBPATTERN":
+        return [av[3]]
+    if op == "BRANCH":
+        return list(av[1])
+    if op in ("ASSERT", "ASSERT_NOT"):
+        return [av[1]]
+    if op == "ATOMIC_GROUP":
+        return [av]
+    if op == "GROUPREF_EXISTS":
+        return [b for b in av[1:] if b is not None]
+    return []
+
+
+def _nullable(items) -> bool:
+    """Whether the sequence can match the empty string."""
+    for item in items:
+        op, av = _op(item), item[1]
+        if op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT"):
+            if av[0] > 0 and not _nullable(av[2]):
+                return False
+        elif op == "BRANCH":
+            if not any(_nullable(b) for b in av[1]):
+                return False
+        elif op in ("SUBPATTERN", "ATOMIC_GROUP"):
+            if not _nullable(_body(op, av)[0]):
+                return False
+        elif op not in ("AT", "ASSERT", "ASSERT_NOT", "GROUPREF_EXISTS"):
+            return False
+    return True
+
+
+def _first(items, ignorecase: bool) -> Tuple[bool, FrozenSet[int]]:
+    """The characters a match of the sequence can start with."""
+    chars = _NONE
+    for item in items:
+        op, av = _op(item), item[1]
+        if op in ("AT", "ASSERT", "ASSERT_NOT"):
+            continue
+        if op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT", "SUBPATTERN", "ATOMIC_GROUP", "BRANCH"):
+            for body in _body(op, av):
+                chars = _union(chars, _first(body, ignorecase))
+        else:
+            return _union(chars, _chars(op, av, ignorecase))
+        if not _nullable([item]):
+            return chars
+    return chars
+
+
+def _has_unbounded(items) -> Optional[list]:
+    """The first unbounded repeat inside the sequence (at any depth), if any."""
+    for item in items:
+        op, av = _op(item), item[1]
+        if _is_repeat(op) and av[1] == MAXREPEAT:
+            return item
+        if op != "POSSESSIVE_REPEAT" and op != "ATOMIC_GROUP":
+            for body in _body(op, av):
+                found = _has_unbounded(body)
+                if found is not None:
+                    return found
+    return None
+
+
+def _nested(body, ignorecase: bool) -> bool:
+    """
+    Whether a repeated body holds an unbounded repeat that successive
+    iterations can share characters with, like (a+)+ or (\\w+\\s?)*. A
+    mandatory separator the inner repeat cannot match, as in (\\w+\\.)+,
+    makes the split unambiguous.
+    """
+    while len(body) == 1 and _op(body[0]) == "SUBPATTERN":
+        body = body[0][1][3]
+    inner = _has_unbounded(body)
+    if inner is None:
+        return False
+    inner_chars = _first(inner[1][2], ignorecase)
+    for item in body:
+        if item is inner or _nullable([item]):
+            continue
+        if not _overlap(_first([item], ignorecase), inner_chars):
+            return False
+    return True
+
+
+def _walk(items, ignorecase: bool, risks: Set[str]):
+    previous = None
+    for item in items:
+        op, av = _op(item), item[1]
+        if _is_repeat(op) and av[1] > 1:
+            body = av[2]
+            if _nested(body, ignorecase):
+                risks.add(NESTED)
+            inner = body
+            while len(inner) == 1 and _op(inner[0]) == "SUBPATTERN":
+                inner = inner[0][1][3]
+            for branch in inner:
+                if _op(branch) == "BRANCH":
+                    firsts = [_first(b, ignorecase) for b in branch[1][1]]
+                    if any(_overlap(a, b) for i, a in enumerate(firsts) for b in firsts[i + 1:]):
+                        risks.add(AMBIGUOUS)
+            if av[1] == MAXREPEAT:
+                if previous is not None and _overlap(_first(previous[1][2], ignorecase), _first(body, ignorecase)):
+                    risks.add(ADJACENT)
+                previous = item
+            else:
+                previous = None
+        else:
+            previous = None
+        for body in _body(op, av):
+            _walk(body, ignorecase, risks)
+
+
+def regex_risks(regex: str) -> List[str]:
+    """
+    Static check for constructs that make a backtracking regex engine slow
+    on crafted input: nested quantifiers, overlapping alternatives under a
+    quantifier and adjacent quantifiers over the same characters. Returns
+    the risks found (sorted; [] for a safe-looking or unparsable regex).
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+    except Exception:
+        return []
+    risks: Set[str] = set()
+    _walk(list(parsed), bool(parsed.state.flags & _IGNORECASE), risks)
+    return sorted(risks)
+
+
+class ScanTimeout(Exception):
+    """A file's scan ran past its time budget."""
+
+
+class _RuleTimeout(Exception):
+    pass
+
+
+def _search(rule: Dict[str, Any], text: str, pos: int, profiler):
+    if profiler is not None and profiler.per_rule:
+        return profiler.search(rule, text, pos)
+    return rule["compiled"].search(text, pos)
+
+
+class TimeBudget:
+    """
+    Per-file and per-rule time limits, enforced with an interval timer
+    (SIGALRM interrupts even a regex search in progress). Timers only work
+    in the main thread of a process (e.g. pool workers, the CLI) and not on
+    Windows; elsewhere scans run without limits.
+
+    rule_timeout applies to rules with risks (see regex_risks): a search
+    running longer is abandoned and the rule recorded in timed_out.
+    file_timeout: file() raises ScanTimeout out of its block when it passes.
+    """
+
+    def __init__(self, file_timeout: Optional[float] = None, rule_timeout: Optional[float] = DEFAULT_RULE_TIMEOUT):
+        self.file_timeout = file_timeout
+        self.rule_timeout = rule_timeout
+        # Rules whose search was abandoned in the current file
+        self.timed_out: Set[str] = set()
+        self._armed = False
+        self._deadline: Optional[float] = None
+        self._in_rule = False
+        self._held = 0
+        self._expired = False
+
+    @staticmethod
+    def available() -> bool:
+        return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+    def _alarm(self, signum, frame):
+        if self._in_rule:
+            raise _RuleTimeout()
+        if self._deadline is None or time.monotonic() < self._deadline:
+            return  # a rule alarm that arrived after its search ended
+        if self._held:
+            self._expired = True
+            return
+        raise ScanTimeout()
+
+    def _rearm(self):
+        remaining = 0 if self._deadline is None else max(self._deadline - time.monotonic(), 1e-6)
+        signal.setitimer(signal.ITIMER_REAL, remaining)
+
+    @contextmanager
+    def file(self):
+        """Scope of one file's scan."""
+        self.timed_out = set()
+        if not self.available():
+            yield
+            return
+        previous = signal.signal(signal.SIGALRM, self._alarm)
+        self._armed = True
+        self._expired = False
+        if self.file_timeout:
+            self._deadline = time.monotonic() + self.file_timeout
+            self._rearm()
+        try:
+            yield
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous if previous is not None else signal.SIG_DFL)
+            self._armed = False
+            self._deadline = None
+
+    @contextmanager
+    def hold(self):
+        """Defers a file timeout to the end of the block (e.g. a cache write)."""
+        self._held += 1
+        try:
+            yield
+        finally:
+            self._held -= 1
+            if not self._held and self._expired:
+                self._expired = False
+                raise ScanTimeout()
+
+    def search(self, rule: Dict[str, Any], text: str, pos: int = 0, profiler=None):
+        """rule["compiled"].search(text, pos) within the rule's time limit (None when over it)."""
+        limit = self.rule_timeout
+        if not self._armed or not limit or not rule.get("risks") \
+                or self._deadline is not None and self._deadline - time.monotonic() <= limit:
+            # Not limited, or the file deadline comes first
+            return _search(rule, text, pos, profiler)
+
+        rule["compiled"]  # a lazy compile is not part of the search
+        signal.setitimer(signal.ITIMER_REAL, limit)
+        self._in_rule = True
+        try:
+            return _search(rule, text, pos, profiler)
+        except _RuleTimeout:
+            self.timed_out.add(rule["name"])
+            return None
+        finally:
+            self._in_rule = False
+            self._rearm()
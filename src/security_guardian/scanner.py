@@ -1,10 +1,81 @@
 import re
-import math
 import os
+import sys
+import codecs
 import subprocess
-from typing import List, Set
-from .models import ScanResult, Severity, ScanSummary
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from .archives import (
+    ARCHIVE_CATEGORIES, ARCHIVE_ERRORS, ARCHIVE_EXTENSIONS, DEFAULT_BUDGET, DEFAULT_MAX_DEPTH, ZIP_EXTENSIONS,
+    ArchiveBudgetExceeded, BudgetedReader, DecompressionBudget, PrefixedReader, archive_kind, iter_members
+)
+from .baseline import Baseline, match_digest
+from .cache import ResultCache, blob_sha, blob_sha_stream
+from .classify import HEAD_BYTES, classify_head
+from .entropy import ENTROPY_THRESHOLD, batch_entropy, shannon_entropy
+from .exclusions import ExclusionMatcher
+from .gitobjects import CatFileBatch, iter_history_blobs, iter_index_blobs, iter_tree_blobs
+from .literals import fold_case
+from .models import ResultStore, ScanResult, Severity, ScanSummary
+from .output import ENTROPY_RULE
 from .policy import PolicyEngine
+from .profiling import ScanProfiler, timed
+from .safety import DEFAULT_RULE_TIMEOUT, ScanTimeout, TimeBudget
+
+# Quoted strings long enough to be checked for entropy
+ENTROPY_CANDIDATE = re.compile(r"['\"]([A-Za-z0-9/+]{16,})['\"]")
+
+# Files larger than this are scanned in line-aligned chunks of this size
+CHUNK_BYTES = 8 * 1024 * 1024
+# A line longer than this is scanned in pieces that overlap by LINE_OVERLAP
+# bytes, so a secret cut by a piece boundary is whole in the next piece
+MAX_PIECE_BYTES = 4 * CHUNK_BYTES
+LINE_OVERLAP = 64 * 1024
+
+# Rules search longer lines in windows of this many characters, overlapping by
+# LINE_WINDOW_OVERLAP: a backtracking regex never sees more than one window
+MAX_LINE_LENGTH = 64 * 1024
+LINE_WINDOW_OVERLAP = 1024
+
+# Modes that scan files on disk: their paths are planned together (see plan_files)
+FILE_MODES = ("default", "untracked", "all-files")
+
+# "@@ -12,3 +14,5 @@" -> 14 (first line of the hunk in the new file)
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,\d+)? @@")
+
+def _unquote_path(path: str) -> str:
+    """Undoes git's C-style quoting of unusual file names."""
+    if len(path) >= 2 and path.startswith('"') and path.endswith('"'):
+        return codecs.escape_decode(path[1:-1].encode("utf-8"))[0].decode("utf-8", errors="replace")
+    return path
+
+def _decode(data: bytes) -> str:
+    """Decodes file content like text-mode open(): UTF-8 with universal newlines."""
+    text = data.decode('utf-8', errors='ignore')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def read_source(filepath: str) -> Optional[str]:
+    """Reads a file's text the way it is scanned (for ResultStore snippets)."""
+    try:
+        with open(filepath, 'rb') as f:
+            return _decode(f.read())
+    except OSError:
+        return None
+
+def _line_offsets(text: str) -> List[int]:
+    """Returns the start offset of every line in the buffer."""
+    offsets = [0]
+    find = text.find
+    pos = find("\n")
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = find("\n", pos + 1)
+    return offsets
 
 class SecretScanner:
     # Industry-standard safe extensions for source code scanning
@@ -19,10 +90,45 @@ class SecretScanner:
         ".md", ".rst", ".txt"
     }
 
-    def __init__(self, policy: PolicyEngine, exclude_patterns: List[str] = None, scan_all_files: bool = False):
+    def __init__(self, policy: PolicyEngine, exclude_patterns: List[str] = None, scan_all_files: bool = False, jobs: int = 1, cache: Optional[ResultCache] = None,
+                 max_file_size: Optional[int] = None, scan_archives: bool = False,
+                 archive_depth: int = DEFAULT_MAX_DEPTH, archive_budget: int = DEFAULT_BUDGET,
+                 max_line_length: int = MAX_LINE_LENGTH, rule_timeout: Optional[float] = DEFAULT_RULE_TIMEOUT,
+                 file_timeout: Optional[float] = None, baseline: Optional[Baseline] = None,
+                 digests: bool = False):
         self.policy = policy
+        self.cache = cache
+        # Accepted findings: matching ones are dropped before a ScanResult exists
+        self.baseline = baseline
+        # Match digests (see baseline.match_digest) are only computed when
+        # something uses them: the baseline, the cache, or digests=True
+        self.digests = digests or baseline is not None or cache is not None
+        # Set while findings are cached unfiltered (see _unfiltered)
+        self._defer_baseline = False
+        # Larger files are skipped unread (None: no limit)
+        self.max_file_size = max_file_size
+        # Scan inside zip/jar/tar/gzip/... files, at most archive_depth levels
+        # deep and archive_budget decompressed bytes per top-level archive
+        self.scan_archives = scan_archives
+        self.archive_depth = archive_depth
+        self.archive_budget = archive_budget
+        self.max_line_length = max(max_line_length, 2 * LINE_WINDOW_OVERLAP)
+        # Time limits (seconds) per search of a risky rule and per file; a
+        # file that exceeds either is reported as partially scanned
+        self.rule_timeout = rule_timeout
+        self.file_timeout = file_timeout
+        self.budget = None
+        self._guard = None
+        if file_timeout or rule_timeout and policy.risky:
+            self.budget = TimeBudget(file_timeout=file_timeout, rule_timeout=rule_timeout)
+            if rule_timeout and policy.risky:
+                self._guard = self.budget
+        if cache is not None:
+            cache.configure(self.cache_settings())
         self.exclude_patterns = exclude_patterns or []
         self.scan_all_files = scan_all_files
+        # Number of worker processes for file scanning (0 = one per CPU)
+        self.jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
         
         # Default excludes to prevent scanning binary/system directories
         default_excludes = [
@@ -33,17 +139,51 @@ class SecretScanner:
         for exc in default_excludes:
             if exc not in self.exclude_patterns:
                 self.exclude_patterns.append(exc)
+        # Compiled once; anchored patterns are relative to the working directory
+        self.exclusions = ExclusionMatcher(self.exclude_patterns)
         
-        self.results: List[ScanResult] = []
-
-    def _is_excluded(self, path: str) -> bool:
-        path = os.path.normpath(path)
-        for pattern in self.exclude_patterns:
-            # Simple substring match can be risky, but sufficient for now.
-            pattern = os.path.normpath(pattern)
-            if pattern in path:
-                return True
-        return False
+        # Findings collected by scan_path; snippets are re-read when rendered
+        self.results = ResultStore(read_source)
+        # Files whose content was scanned, and skipped files per category (for ScanSummary)
+        self.files_scanned = 0
+        self.skipped: Counter = Counter()
+        # Files whose scan was cut short by a time limit: path -> reason
+        self.partial: Dict[str, str] = {}
+        # Findings dropped because the baseline lists them
+        self.suppressed = 0
+        # Findings of the unit currently being scanned (drained by iter_scan_path)
+        self._found: List[ScanResult] = []
+        # Optional per-phase timing (see profiling.ScanProfiler)
+        self.profiler: Optional[ScanProfiler] = None
+
+    def cache_settings(self) -> Dict[str, Any]:
+        """The settings besides the rules that change a file's findings."""
+        return {"max_line_length": self.max_line_length, "entropy_threshold": ENTROPY_THRESHOLD}
+
+    def _phase(self, name: str):
+        return timed(self.profiler, name)
+
+    @contextmanager
+    def _time_budget(self, display: str):
+        """
+        Scope of one file's scan under the time limits. Findings made before
+        a limit was hit are kept; the file is recorded in self.partial.
+        """
+        if self.budget is None:
+            yield
+            return
+        try:
+            with self.budget.file():
+                yield
+        except ScanTimeout:
+            self.partial[display] = f"file timeout ({self.file_timeout:g}s)"
+        else:
+            if self.budget.timed_out:
+                self.partial[display] = "rule timeout: " + ", ".join(sorted(self.budget.timed_out))
+
+    def _is_excluded(self, path: str, root: str) -> bool:
+        """Checks a path and its parent directories below the scan root."""
+        return self.exclusions.match(path, root)
 
     def _run_git_cmd(self, args: List[str], cwd: str) -> List[str]:
         try:
@@ -58,164 +198,850 @@ class SecretScanner:
         except (subprocess.CalledProcessError, FileNotFoundError):
             return []
 
-    def get_git_tracked_files(self, root_path: str) -> List[str]:
-        return self._run_git_cmd(["ls-files"], cwd=root_path)
+    def _run_git_raw(self, args: List[str], cwd: str) -> str:
+        """Runs git and returns its raw stdout (lines are not stripped)."""
+        try:
+            result = subprocess.run(
+                ["git"] + args,
+                cwd=cwd,
+                capture_output=True,
+                encoding="utf-8",
+                errors="replace",
+                check=True
+            )
+            return result.stdout
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return ""
+
+    def get_git_tracked_files(self, root_path: str, pathspecs: Optional[List[str]] = None) -> List[str]:
+        return self._run_git_cmd(["--literal-pathspecs", "ls-files", "--"] + (pathspecs or []), cwd=root_path)
 
     def get_git_staged_files(self, root_path: str) -> List[str]:
         return self._run_git_cmd(["diff", "--name-only", "--cached"], cwd=root_path)
     
-    def get_git_untracked_files(self, root_path: str) -> List[str]:
-         return self._run_git_cmd(["ls-files", "--others", "--exclude-standard"], cwd=root_path)
+    def get_git_untracked_files(self, root_path: str, pathspecs: Optional[List[str]] = None) -> List[str]:
+         return self._run_git_cmd(["--literal-pathspecs", "ls-files", "--others", "--exclude-standard", "--"]
+                                  + (pathspecs or []), cwd=root_path)
+
+    def get_git_staged_hunks(self, root_path: str) -> Dict[str, List[Tuple[int, str]]]:
+        """
+        Returns the lines added in the index, keyed by path relative to
+        root_path, as (line number in the staged file, line) pairs.
+        """
+        output = self._run_git_raw([
+            "-c", "core.quotepath=off",
+            "diff", "--cached", "-U0", "--no-color", "--no-ext-diff",
+            "--relative", "--diff-filter=d", "--src-prefix=a/", "--dst-prefix=b/"
+        ], cwd=root_path)
+
+        hunks: Dict[str, List[Tuple[int, str]]] = {}
+        current = None
+        line_num = 0
+        # Between "diff --git" and the first "@@": header lines. In a hunk, an
+        # added line "++ x" reads "+++ x" and must not be taken for one.
+        in_hunk = False
+        previous = ""
+        for raw in output.split("\n"):
+            if raw.startswith("diff --git "):
+                current = None
+                in_hunk = False
+            elif not in_hunk and raw.startswith("+++ ") and previous.startswith("--- "):
+                target = _unquote_path(raw[4:])
+                current = target[2:] if target.startswith("b/") else None
+            elif raw.startswith("@@"):
+                m = HUNK_HEADER.match(raw)
+                line_num = int(m.group(1)) if m else 0
+                in_hunk = True
+            elif in_hunk and raw.startswith("+") and current is not None:
+                hunks.setdefault(current, []).append((line_num, raw[1:] + "\n"))
+                line_num += 1
+            previous = raw
+        return hunks
 
-    def scan_path(self, path: str, mode: str = "default"):
+    def scan_path(self, path: str, mode: str = "default", rev_range: str = "--all"):
         """
         Scans a path based on the selected mode.
-        modes: 'default', 'staged', 'all', 'untracked'
+        modes: 'default', 'staged', 'all', 'untracked', 'history', 'index', 'ref'
+        rev_range is the revision range for 'history' (e.g. 'main~50..main',
+        default: all refs) and the commit to scan for 'ref' (e.g. 'HEAD')
         """
-        path = os.path.abspath(path)
-        
+        self.scan_paths([path], mode=mode, rev_range=rev_range)
+
+    def scan_paths(self, paths: List[str], mode: str = "default", rev_range: str = "--all"):
+        """Scans several paths as one scan: every file at most once (see iter_scan_paths)."""
+        self.results.extend(self.iter_scan_paths(paths, mode=mode, rev_range=rev_range))
+
+    def summary(self) -> ScanSummary:
+        """Totals of everything collected by scan_path so far."""
+        blocking = [s for s in Severity if self.policy.get_action(s) == "BLOCK"]
+        return ScanSummary.from_results(self.results, self.files_scanned, blocking, skipped=self.skipped,
+                                        partial=self.partial, suppressed=self.suppressed)
+
+    def iter_scan_path(self, path: str, mode: str = "default", rev_range: str = "--all") -> Iterator[ScanResult]:
+        """
+        Generator variant of scan_path: yields findings as soon as each file
+        is scanned instead of collecting them in self.results.
+        """
+        return self.iter_scan_paths([path], mode=mode, rev_range=rev_range)
+
+    def iter_scan_paths(self, paths: List[str], mode: str = "default", rev_range: str = "--all") -> Iterator[ScanResult]:
+        """
+        Generator variant of scan_paths. The paths are planned together:
+        duplicates and paths inside another requested directory are dropped,
+        and in the file modes (default, untracked, all-files) the files of
+        all paths are listed with one git call per repository and scanned
+        in one sorted pass.
+        """
+        for _ in self._scan_paths(paths, mode, rev_range):
+            found, self._found = self._found, []
+            yield from found
+
+    def _scan_paths(self, paths: List[str], mode: str, rev_range: str) -> Iterator[None]:
+        paths = self._top_level_paths(paths, keep_files=mode in FILE_MODES)
+        if mode not in FILE_MODES:
+            # Repository-level listings (history, trees, the index, the staged diff) per path
+            for path in paths:
+                yield from self._scan_units(path, mode, rev_range)
+            return
+        with self._phase("enumeration"):
+            files = self.plan_files(paths, mode)
+        yield from self._scan_files(files)
+
+    @staticmethod
+    def _top_level_paths(paths: List[str], keep_files: bool = False) -> List[str]:
+        """
+        The requested paths made absolute, in order, without duplicates or
+        paths below another requested directory. keep_files: files named
+        explicitly are kept (they are scanned even if untracked or excluded).
+        """
+        absolute: List[str] = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if path not in absolute:
+                absolute.append(path)
+        dirs = [os.path.join(path, "") for path in absolute if os.path.isdir(path)]
+        return [path for path in absolute
+                if (keep_files and os.path.isfile(path)) or not any(path.startswith(d) for d in dirs)]
+
+    def _git_root(self, path: str) -> Optional[str]:
+        """The work tree directory containing path, or None outside git."""
+        current = path
+        while True:
+            # A .git directory, or a .git file in worktrees and submodules
+            if os.path.exists(os.path.join(current, ".git")):
+                return current
+            parent = os.path.dirname(current)
+            if parent == current:
+                break
+            current = parent
+        # No .git above (e.g. GIT_DIR is set): ask git
+        prefix = self._run_git_raw(["rev-parse", "--show-prefix"], cwd=path)
+        if not prefix:
+            return None
+        root = path
+        for _ in filter(None, prefix.strip().split("/")):
+            root = os.path.dirname(root)
+        return root
+
+    def plan_files(self, paths: List[str], mode: str = "default") -> List[str]:
+        """
+        The files a scan of paths (absolute, from _top_level_paths) covers in
+        a file mode. Directories are grouped by their git repository, whose
+        tracked (and for 'untracked', untracked) files are listed once for
+        the whole group; outside git, and in 'all-files', directories are
+        walked. Every file appears once.
+        """
+        files: Set[str] = set()
+        repos: Dict[str, List[str]] = {}
+        for path in paths:
+            if os.path.isfile(path):
+                files.add(path)
+                continue
+            if mode == "all-files":
+                files.update(self._walk(path))
+                continue
+            root = self._git_root(path)
+            if root is None:
+                print(f"[INFO] Not a git repository. Falling back to disk enumeration.", file=sys.stderr)
+                files.update(self._walk(path))
+            else:
+                repos.setdefault(root, []).append(path)
+
+        for root, dirs in repos.items():
+            # One listing per repository, limited to the requested directories
+            pathspecs = [] if root in dirs else [os.path.relpath(d, root) for d in dirs]
+            relative_paths = self.get_git_tracked_files(root, pathspecs)
+            if mode == "untracked":
+                relative_paths += self.get_git_untracked_files(root, pathspecs)
+            prefixes = [(os.path.join(d, ""), d) for d in dirs]
+            for relative_path in relative_paths:
+                full_path = os.path.join(root, relative_path)
+                # Exclusions are checked below the requested directory, as for a scan of it alone
+                scan_root = next((d for prefix, d in prefixes if full_path.startswith(prefix)), root)
+                if full_path in files or not os.path.exists(full_path) or self._is_excluded(full_path, scan_root):
+                    continue
+                files.add(full_path)
+        return sorted(files)
+
+    def _scan_units(self, path: str, mode: str, rev_range: str) -> Iterator[None]:
+        """
+        Runs a repository-level scan of path ('staged', 'index', 'history',
+        'ref'), yielding after each unit of work (usually a file) once its
+        findings are in self._found.
+        """
+        if mode == "history":
+            # Deduped after the path filters: a blob first seen under an
+            # excluded path is still scanned where it appears under another
+            yield from self._scan_blobs(path, iter_history_blobs(path, rev_range, unique=False), unique=True)
+            return
+
+        if mode == "ref":
+            # Reads the commit's tree from the object store (no checkout needed)
+            yield from self._scan_blobs(path, iter_tree_blobs(path, rev_range))
+            return
+
         if os.path.isfile(path):
             self._scan_file(path)
+            yield
             return
 
-        files_to_scan: Set[str] = set()
-        
-        # Detect if this is a git repo
-        is_git_repo = os.path.exists(os.path.join(path, ".git")) or self._run_git_cmd(["rev-parse", "--is-inside-work-tree"], cwd=path)
-
-        if not is_git_repo and mode in ["default", "staged"]:
-            # Fallback to walking directory if not a git repo but asked for default scan
-            # But technically 'staged' makes no sense without git.
-            # We'll treat 'default' as 'walk safe files' if no git.
-            print(f"[INFO] Not a git repository. Falling back to disk enumeration.")
-            self._walk_and_scan(path)
+        if self._git_root(path) is None:
+            # 'staged' and 'index' make no sense without git: scan the files on disk
+            print(f"[INFO] Not a git repository. Falling back to disk enumeration.", file=sys.stderr)
+            yield from self._walk_and_scan(path)
             return
 
         if mode == "staged":
-            # Scan only staged files
-            relative_paths = self.get_git_staged_files(path)
-            files_to_scan.update([os.path.join(path, p) for p in relative_paths])
-            
-        elif mode == "default":
-            # Scan tracked files only
-            relative_paths = self.get_git_tracked_files(path)
-            files_to_scan.update([os.path.join(path, p) for p in relative_paths])
-            
-        elif mode == "untracked":
-             # Tracked + Untracked
-            tracked = self.get_git_tracked_files(path)
-            untracked = self.get_git_untracked_files(path)
-            files_to_scan.update([os.path.join(path, p) for p in tracked + untracked])
-            
-        elif mode == "all-files":
-             # Scan everything explicitly
-             self._walk_and_scan(path)
-             return
-
-        # Process the collected list
-        for full_path in files_to_scan:
-            if not os.path.exists(full_path):
-                continue
-            if self._is_excluded(full_path):
+            # Scan only the lines added in the index
+            yield from self._scan_staged(path)
+            return
+
+        # Scan the staged snapshot of every tracked file, straight from the object store
+        yield from self._scan_blobs(path, iter_index_blobs(path))
+
+    def _scan_staged(self, path: str) -> Iterator[None]:
+        """
+        Pre-commit mode: scans only the added lines of the staged diff, so
+        the cost scales with the size of the change, not of the files.
+        """
+        with self._phase("enumeration"):
+            hunks = self.get_git_staged_hunks(path)
+        for relative_path in sorted(hunks):
+            full_path = os.path.join(path, relative_path)
+            if self._is_excluded(full_path, path) or not self._has_scannable_extension(full_path, count=True):
                 continue
-            self._scan_file(full_path)
+            self.files_scanned += 1
+            with self._time_budget(full_path):
+                for line_num, line in hunks[relative_path]:
+                    self._scan_line(full_path, line_num, line)
+            yield
+
+    def _scan_blobs(self, path: str, entries: Iterator[Tuple[Optional[str], str, str]],
+                    unique: bool = False) -> Iterator[None]:
+        """
+        Scans (commit, path, blob) entries from a git listing. Content is read
+        through one `git cat-file --batch` pipe instead of the working tree,
+        and the blob id doubles as the cache key. Findings are attributed to
+        the entry's commit, if any (in history mode: the first commit and
+        path that introduced the blob). unique: each blob is scanned once.
+        """
+        scanned: Set[str] = set()
+        with CatFileBatch(path) as objects:
+            for commit, relative_path, blob in entries:
+                if unique and blob in scanned:
+                    continue
+                # Only components below the repo count: a bare mirror
+                # directory is usually named "<repo>.git"
+                full_path = os.path.join(path, relative_path)
+                if self._is_excluded(full_path, path) or not self._has_scannable_extension(full_path, count=True):
+                    continue
+                if unique:
+                    scanned.add(blob)
+
+                with self._phase("read"):
+                    obj = objects.read(blob)
+                if obj is None:
+                    continue
+                data = obj[1]
+                with self._phase("binary_check"):
+                    category = self._classify(len(data), data[:HEAD_BYTES])
+                if category is not None:
+                    self.skipped[category] += 1
+                    continue
 
-    def _walk_and_scan(self, path: str):
+                first_new = len(self._found)
+                # Only the scan is time-limited: the cat-file pipe is never interrupted
+                with self._time_budget(full_path):
+                    self._scan_content(full_path, data, blob=blob)
+                for result in self._found[first_new:]:
+                    result.commit = commit
+                    # The snippet comes from the blob, not the file on disk
+                    result.span = None
+                yield
+
+    def _walk_and_scan(self, path: str) -> Iterator[None]:
+        with self._phase("enumeration"):
+            collected = self._walk(path)
+        yield from self._scan_files(collected)
+
+    def _walk(self, path: str) -> List[str]:
+        collected = []
         for root, dirs, files in os.walk(path):
-            # Exclude directories
-            dirs[:] = [d for d in dirs if not self._is_excluded(os.path.join(root, d))]
-            
+            # Prune excluded directories: nothing below them is visited
+            dirs[:] = [d for d in dirs if not self.exclusions.match_entry(os.path.join(root, d), is_dir=True)]
+
             for name in files:
                 full_path = os.path.join(root, name)
-                if not self._is_excluded(full_path):
-                    self._scan_file(full_path)
+                if not self.exclusions.match_entry(full_path):
+                    collected.append(full_path)
+        return collected
+
+    def _scan_files(self, files: List[str]) -> Iterator[None]:
+        """
+        Scans the files in sorted order, spreading them across a process pool
+        when more than one job is configured. Results are produced in the
+        same order either way.
+        """
+        files = sorted(files)
+        tasks = files
+        if self.jobs > 1 and self.scan_archives:
+            # Zip members can be read independently: they are spread over the pool too
+            tasks = []
+            for full_path in files:
+                tasks.extend(self._zip_members(full_path) or [full_path])
+
+        if self.jobs <= 1 or len(tasks) <= 1:
+            for full_path in files:
+                self._scan_file(full_path)
+                yield
+            return
 
-    def _is_binary(self, filepath: str) -> bool:
-        """Checks if a file is binary by looking for null bytes in the first 1KB."""
+        workers = min(self.jobs, len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 8))
+        options = {
+            "scan_all_files": self.scan_all_files, "cache": self.cache, "max_file_size": self.max_file_size,
+            "scan_archives": self.scan_archives, "archive_depth": self.archive_depth,
+            "archive_budget": self.archive_budget, "max_line_length": self.max_line_length,
+            "rule_timeout": self.rule_timeout, "file_timeout": self.file_timeout, "baseline": self.baseline,
+            "digests": self.digests,
+            # Workers profile too (per_rule flag, or None)
+            "profile": None if self.profiler is None else self.profiler.per_rule,
+        }
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(self.policy, options)
+        ) as pool:
+            for scanned, skipped, partial, suppressed, file_results, profile in pool.map(
+                    _scan_file_worker, tasks, chunksize=chunksize):
+                self.files_scanned += scanned
+                self.skipped.update(skipped)
+                self.partial.update(partial)
+                self.suppressed += suppressed
+                if profile is not None:
+                    self.profiler.merge(profile)
+                self._found.extend(file_results)
+                yield
+
+    def _zip_members(self, filepath: str) -> List[Tuple[str, int, int]]:
+        """
+        Splits a zip archive (when archives are scanned) into per-member
+        tasks: (path, member index, budget). The budget is shared out so the
+        members together never exceed the archive's; the header sizes bound
+        what each member can decompress to. Returns [] to scan it whole.
+        """
+        if os.path.splitext(filepath)[1].lower() not in ZIP_EXTENSIONS:
+            return []
         try:
             with open(filepath, 'rb') as f:
-                chunk = f.read(1024)
-                if b'\0' in chunk:
-                    return True
-        except Exception:
+                # Same checks as _scan_file, which would scan it as a zip
+                if self.max_file_size is not None and os.fstat(f.fileno()).st_size > self.max_file_size:
+                    return []
+                if archive_kind(f.read(4)) != "zip":
+                    return []
+                with zipfile.ZipFile(f) as archive:
+                    members = [(i, info.file_size) for i, info in enumerate(archive.infolist()) if not info.is_dir()]
+        except ARCHIVE_ERRORS:
+            return []
+        spare = self.archive_budget - sum(size for _, size in members)
+        if len(members) < 2 or spare < 0:
+            return []
+        share = spare // len(members)
+        return [(filepath, index, size + share) for index, size in members]
+
+    def _has_scannable_extension(self, filepath: str, count: bool = False) -> bool:
+        """count: record a skip when the extension is filtered out."""
+        if self.scan_all_files:
+            return True
+        _, ext = os.path.splitext(filepath)
+        ext = ext.lower()
+        if ext in self.SAFE_EXTENSIONS or self.scan_archives and ext in ARCHIVE_EXTENSIONS:
             return True
+        if count:
+            self.skipped["extension"] += 1
         return False
 
+    def _classify(self, size: int, head: bytes) -> Optional[str]:
+        """Returns why content of this size and first block is skipped, or None to scan it."""
+        if self.max_file_size is not None and size > self.max_file_size:
+            return "too_large"
+        return classify_head(head)
+
     def _scan_file(self, filepath: str):
         # 0. Check Extension (unless --all-files is ON)
         # In strict Git modes, we STILL filter by extension unless user forces all-files.
-        if not self.scan_all_files:
-            _, ext = os.path.splitext(filepath)
-            if ext.lower() not in self.SAFE_EXTENSIONS:
+        if not self._has_scannable_extension(filepath, count=True):
+            return
+        with self._time_budget(filepath):
+            self._read_and_scan(filepath)
+
+    def _read_and_scan(self, filepath: str):
+        try:
+            f = open(filepath, 'rb')
+        except OSError:
+            self.skipped["unreadable"] += 1
+            return
+        with f:
+            # 1. Classify by size and the first block, which is the whole
+            # content of most files: nothing is opened or read twice
+            size = os.fstat(f.fileno()).st_size
+            head = b""
+            if self.max_file_size is None or size <= self.max_file_size:
+                try:
+                    with self._phase("read"):
+                        head = f.read(HEAD_BYTES)
+                except OSError:
+                    self.skipped["unreadable"] += 1
+                    return
+            with self._phase("binary_check"):
+                category = self._classify(size, head)
+            if category in ARCHIVE_CATEGORIES and self.scan_archives and archive_kind(head):
+                self._scan_archive_file(filepath, f, head)
                 return
+            if category is not None:
+                self.skipped[category] += 1
+                return
+
+            # 2. Large files are streamed: memory stays bounded by the chunk size
+            if size > CHUNK_BYTES:
+                f.seek(0)
+                self._scan_stream(filepath, f, size)
+                return
+
+            # 3. Read the rest, if any (hashed for the cache, then decoded)
+            data = head
+            if len(head) == HEAD_BYTES:
+                try:
+                    with self._phase("read"):
+                        data = head + f.read()
+                except OSError:
+                    self.skipped["unreadable"] += 1
+                    return
+
+        self._scan_content(filepath, data)
 
-        # 1. Skip if binary
-        if self._is_binary(filepath):
+    def _scan_archive_file(self, filepath: str, f: BinaryIO, head: bytes):
+        """Scans the members of an archive on disk (findings: 'archive!member')."""
+        try:
+            self._scan_archive(filepath, f, head, 0, DecompressionBudget(self.archive_budget), seekable=True)
+        except ArchiveBudgetExceeded:
+            self.skipped["archive_budget"] += 1
+
+    def _scan_zip_member(self, filepath: str, index: int, budget: int):
+        """Scans one member of a zip archive on disk (a pool task, see _zip_members)."""
+        try:
+            with zipfile.ZipFile(filepath) as archive:
+                info = archive.infolist()[index]
+                display = f"{filepath}!{info.filename}"
+                budget = DecompressionBudget(budget)
+                with self._time_budget(display), archive.open(info) as content:
+                    self._scan_member(display, BudgetedReader(content, budget), info.file_size, 1, budget)
+        except ArchiveBudgetExceeded:
+            self.skipped["archive_budget"] += 1
+        except ARCHIVE_ERRORS:
+            self.skipped["archive_error"] += 1
+
+    def _scan_archive(self, display: str, stream: BinaryIO, head: bytes, depth: int,
+                      budget: DecompressionBudget, seekable: bool = False):
+        """
+        Scans each member of the archive (or compressed stream) starting with
+        head through the same buffer engine, one member at a time and without
+        writing anything to disk. depth is the nesting level of the archive.
+        """
+        try:
+            for name, content, size in iter_members(stream, head, budget, seekable=seekable):
+                # A compression layer keeps the name: 'dump.sql.gz:12', 'app.tar.gz!config.py:3'
+                member = display if name is None else f"{display}!{name}"
+                self._scan_member(member, content, size, depth + 1, budget)
+        except ARCHIVE_ERRORS:
+            self.skipped["archive_error"] += 1
+
+    def _scan_member(self, display: str, content: BinaryIO, size: Optional[int], depth: int,
+                     budget: DecompressionBudget):
+        if self.max_file_size is not None and size is not None and size > self.max_file_size:
+            self.skipped["too_large"] += 1
+            return
+        with self._phase("read"):
+            head = content.read(HEAD_BYTES)
+        with self._phase("binary_check"):
+            category = self._classify(len(head) if size is None else size, head)
+
+        if category in ARCHIVE_CATEGORIES and archive_kind(head):
+            if depth >= self.archive_depth:
+                self.skipped["archive_depth"] += 1
+            else:
+                self._scan_archive(display, content, head, depth, budget)
             return
+        if category is not None:
+            self.skipped[category] += 1
+            return
+        if not self._has_scannable_extension(display, count=True):
+            return
+
+        if len(head) == HEAD_BYTES and (size is None or size > CHUNK_BYTES):
+            self._scan_stream(display, PrefixedReader(head, content), None)
+            return
+
+        data = head
+        if len(head) == HEAD_BYTES:
+            with self._phase("read"):
+                data = head + content.read()
+        first_new = len(self._found)
+        self._scan_content(display, data)
+        for result in self._found[first_new:]:
+            # Decompressed content, not the file on disk ('dump.sql.gz' keeps its name)
+            result.span = None
+
+    def _scan_stream(self, filepath: str, f: BinaryIO, size: Optional[int]):
+        """
+        Scans a stream in chunks cut after the last line break, so no
+        line is ever split between two chunks (findings are verified per
+        line). Snippets are kept as strings: rendering must not read the
+        whole file back. size is given for files that can be rewound, which
+        are hashed first for the result cache.
+        """
+        self.files_scanned += 1
+        blob = None
+        if self.cache is not None and size is not None:
+            with self._phase("read"):
+                blob = blob_sha_stream(f, size)
+            cached = self.cache.get(blob)
+            if cached is not None:
+                self._add_cached(filepath, cached)
+                return
+            f.seek(0)
+
+        with self._unfiltered(blob is not None) as first_new:
+            self._scan_chunks(filepath, f)
+            if blob is not None:
+                self._put_cached(blob, first_new)
+
+    def _scan_chunks(self, filepath: str, f: BinaryIO):
+        """The line-aligned chunk loop of _scan_stream."""
+        line_num = 1
+        pending = b""
+        # Findings already reported for a line scanned in overlapping pieces
+        split_line, split_seen = 0, set()
+        while True:
+            with self._phase("read"):
+                data = f.read(CHUNK_BYTES)
+            buf = pending + data if pending else data
+            if not buf:
+                break
+
+            if not data:
+                # End of file: the rest has no trailing line break
+                cut = len(buf)
+            else:
+                # A '\r' at the very end may be the first half of '\r\n'
+                cut = max(buf.rfind(b"\n"), buf.rfind(b"\r", 0, len(buf) - 1)) + 1
+
+            if cut == 0 and len(buf) < MAX_PIECE_BYTES:
+                # Inside a long line: read on
+                pending = buf
+                continue
+
+            piece = buf[:cut] if cut else buf
+            pending = buf[cut:] if cut else buf[-LINE_OVERLAP:]
+            text = _decode(piece)
 
+            first = len(self._found)
+            self._scan_buffer(filepath, text, first_line=line_num, base_offset=None)
+            if split_line == line_num or not cut:
+                # Pieces of one long line overlap: drop findings already made
+                if split_line != line_num:
+                    split_line, split_seen = line_num, set()
+                kept = []
+                for result in self._found[first:]:
+                    key = (result.line_number, result.secret_type)
+                    if result.line_number != split_line or key not in split_seen:
+                        kept.append(result)
+                        if result.line_number == split_line:
+                            split_seen.add(key)
+                self._found[first:] = kept
+
+            if cut:
+                line_num += text.count("\n")
+            if not data:
+                break
+
+    def _scan_content(self, filepath: str, data: bytes, blob: Optional[str] = None):
+        """
+        Scans raw file content; blob is its git blob SHA when already known.
+        """
+        self.files_scanned += 1
+        if self.cache is None:
+            self._scan_buffer(filepath, _decode(data))
+            return
+
+        # Unchanged content under the same ruleset is skipped entirely
+        blob = blob or blob_sha(data)
+        cached = self.cache.get(blob)
+        if cached is not None:
+            self._add_cached(filepath, cached)
+            return
+
+        with self._unfiltered() as first_new:
+            self._scan_buffer(filepath, _decode(data))
+            self._put_cached(blob, first_new)
+
+    def _add_cached(self, filepath: str, cached):
+        # Cached findings are unfiltered: the baseline depends on the path
+        for line_num, secret_type, severity, snippet, digest in cached:
+            if self._suppresses(filepath, digest):
+                continue
+            self._found.append(ScanResult(
+                file_path=filepath,
+                line_number=line_num,
+                secret_type=secret_type,
+                severity=Severity(severity),
+                content_snippet=snippet,
+                digest=digest
+            ))
+
+    @contextmanager
+    def _unfiltered(self, active: bool = True):
+        """
+        Scope of a scan whose findings go to the cache: the cache holds them
+        unfiltered (the baseline depends on the path), so the baseline is
+        applied when the scope ends. Yields where the scope's findings start.
+        """
+        first_new = len(self._found)
+        if not active or self.baseline is None:
+            yield first_new
+            return
+        self._defer_baseline = True
         try:
-            # 2. Open as text with error handling
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                for i, line in enumerate(lines, 1):
-                    self._scan_line(filepath, i, line)
-        except Exception:
-            pass
-
-    def _scan_line(self, filepath: str, line_num: int, line: str):
+            yield first_new
+        finally:
+            self._defer_baseline = False
+            with self.budget.hold() if self.budget is not None else nullcontext():
+                kept = [r for r in self._found[first_new:] if not self._suppresses(r.file_path, r.digest)]
+                self._found[first_new:] = kept
+
+    def _suppresses(self, filepath: str, digest: Optional[str]) -> bool:
+        """Whether the baseline drops a finding (counted in self.suppressed)."""
+        if self.baseline is None or digest is None or not self.baseline.suppresses(filepath, digest):
+            return False
+        self.suppressed += 1
+        return True
+
+    def _put_cached(self, blob: str, first_new: int):
+        if self.budget is None:
+            self._store_cached(blob, first_new)
+        elif not self.budget.timed_out:
+            # Incomplete results are never cached, nor is a write cut short
+            with self.budget.hold():
+                self._store_cached(blob, first_new)
+
+    def _store_cached(self, blob: str, first_new: int):
+        self.cache.put(blob, [
+            (r.line_number, r.secret_type, r.severity.value, r.content_snippet, r.digest)
+            for r in self._found[first_new:]
+        ])
+
+    def _scan_buffer(self, filepath: str, text: str, first_line: int = 1, base_offset: Optional[int] = 0):
+        """
+        Scans a decoded file buffer (the whole file, or a chunk of whole lines
+        starting at line first_line).
+        The rule prefilter and the entropy candidate regex run over the buffer
+        once; only the lines they hit are handed to _scan_line, so the findings
+        are the same as a line-by-line scan. base_offset is where the buffer
+        starts in the file's text (None: do not record snippet offsets).
+        """
+        hits: Set[int] = set()
+
+        with self._phase("regex"):
+            # Case folding keeps the length: offsets into it are offsets into text
+            folded = fold_case(text)
+            # Anchors never contain a newline, so every hit lies on one line
+            if self.policy.prefilter is not None:
+                hits.update(m.start() for m in self.policy.prefilter.finditer(folded))
+
+            # Rules without an anchor search the buffer directly. Each search
+            # resumes at the next line: a match may span newlines (e.g. via
+            # \s*), but findings are always verified per line.
+            profiler = self.profiler if self.profiler is not None and self.profiler.per_rule else None
+            if self.policy.per_line_unanchored:
+                hits.update(_line_offsets(text))
+            for pattern in self.policy.buffer_unanchored:
+                pos = 0
+                while True:
+                    if self._guard is not None:
+                        m = self._guard.search(pattern, text, pos, profiler=profiler)
+                    elif profiler is None:
+                        m = pattern["compiled"].search(text, pos)
+                    else:
+                        m = profiler.search(pattern, text, pos)
+                    if m is None:
+                        break
+                    hits.add(m.start())
+                    pos = text.find("\n", m.start()) + 1
+                    if pos == 0:
+                        break
+
+        with self._phase("entropy"):
+            # Entropy candidates can never span lines. They are scored in one
+            # batch and only lines holding a token above the threshold remain;
+            # _scan_line reuses the scores.
+            candidates = [(m.start(), m.group(1)) for m in ENTROPY_CANDIDATE.finditer(text)]
+            scores = batch_entropy(token for _, token in candidates)
+            hits.update(offset for offset, token in candidates if scores[token] > ENTROPY_THRESHOLD)
+
+        # Line numbers are counted lazily between consecutive hits
+        line_num = first_line
+        counted_to = 0
+        last_start = -1
+        for offset in sorted(hits):
+            start = text.rfind("\n", 0, offset) + 1
+            if start == last_start:
+                continue
+            last_start = start
+            line_num += text.count("\n", counted_to, start)
+            counted_to = start
+
+            end = text.find("\n", start)
+            end = len(text) if end == -1 else end + 1
+            if start < end:
+                self._scan_line(filepath, line_num, text[start:end],
+                                None if base_offset is None else base_offset + start, scores)
+
+    def _scan_line(self, filepath: str, line_num: int, line: str, offset: Optional[int] = None,
+                   entropy_scores: Optional[Dict[str, float]] = None):
+        """
+        offset is where the line starts in the file's decoded text, if known;
+        entropy_scores maps candidate tokens to entropies already computed.
+        """
         found_match = False
+        snippet = line.strip()
+        span = None
+        if offset is not None:
+            start = offset + len(line) - len(line.lstrip())
+            span = (start, start + len(snippet))
         
-        # 1. Regex Scan
-        for pattern in self.policy.patterns:
-            compiled_regex = pattern.get("compiled")
-            if not compiled_regex:
-                continue
+        # 1. Regex Scan (single pass over the combined rule matcher)
+        with self._phase("regex"):
+            if len(line) <= self.max_line_length:
+                matched, keyword = self.policy.search_line(line, self.profiler, self._guard)
+            else:
+                matched, keyword = self._match_long_line(line)
+        for pattern, m in matched:
+            found_match = True
+            digest = None
+            if self.digests:
+                digest = match_digest(pattern["name"], m.group(0))
+                if not self._defer_baseline and self._suppresses(filepath, digest):
+                    continue
 
-            try:
-                if compiled_regex.search(line):
-                    found_match = True
-                    
-                    # Determine Severity (Context Aware)
-                    severity = pattern["severity"]
-                    detected_name = pattern["name"]
-                    
-                    if severity == Severity.MEDIUM:
-                        for kw in self.policy.context_keywords:
-                            if kw.lower() in line.lower():
-                                severity = Severity.HIGH
-                                detected_name += f" (Context: {kw})"
-                                break
-                                
-                    self.results.append(ScanResult(
-                        file_path=filepath,
-                        line_number=line_num,
-                        secret_type=detected_name,
-                        severity=severity,
-                        content_snippet=line.strip()
-                    ))
-            except Exception:
-                continue
+            # Determine Severity (Context Aware)
+            severity = pattern["severity"]
+            detected_name = pattern["name"]
+
+            if severity == Severity.MEDIUM and keyword is not None:
+                severity = Severity.HIGH
+                detected_name += f" (Context: {keyword})"
+
+            self._found.append(ScanResult(
+                file_path=filepath,
+                line_number=line_num,
+                secret_type=detected_name,
+                severity=severity,
+                content_snippet=snippet,
+                span=span,
+                digest=digest
+            ))
 
         # 2. Entropy Scan (If no regex match)
         if not found_match:
-            self._scan_entropy(filepath, line_num, line)
+            with self._phase("entropy"):
+                self._scan_entropy(filepath, line_num, line, snippet, span, entropy_scores)
+
+    def _match_long_line(self, line: str) -> Tuple[List[Tuple[Dict, re.Match]], Optional[str]]:
+        """
+        policy.match_line for a line over max_line_length: the rules search
+        overlapping windows of it, so a match shorter than the overlap is
+        never cut. The context keyword is still taken from the whole line.
+        """
+        step = self.max_line_length - LINE_WINDOW_OVERLAP
+        found: Dict[str, re.Match] = {}
+        for start in range(0, len(line) - LINE_WINDOW_OVERLAP, step):
+            window, _ = self.policy.search_line(line[start:start + self.max_line_length], self.profiler, self._guard)
+            for p, m in window:
+                found.setdefault(p["name"], m)
+        if not found:
+            return [], None
+        return [(p, found[p["name"]]) for p in self.policy.rules if p["name"] in found], self.policy.context_keyword(line)
 
-    def _scan_entropy(self, filepath: str, line_num: int, line: str):
+    def _scan_entropy(self, filepath: str, line_num: int, line: str, snippet: str, span: Optional[Tuple[int, int]],
+                      scores: Optional[Dict[str, float]] = None):
          # Extract potential secret strings (assignments)
-         strings = re.findall(r"['\"]([A-Za-z0-9/+]{16,})['\"]", line)
+         strings = ENTROPY_CANDIDATE.findall(line)
          for s in strings:
-             entropy = self._calculate_entropy(s)
-             if entropy > 4.5: # Threshold
-                 self.results.append(ScanResult(
+             entropy = scores.get(s) if scores is not None else None
+             if entropy is None:
+                 entropy = self._calculate_entropy(s)
+             if entropy > ENTROPY_THRESHOLD:
+                 digest = match_digest(ENTROPY_RULE, s) if self.digests else None
+                 if not self._defer_baseline and self._suppresses(filepath, digest):
+                     continue
+                 self._found.append(ScanResult(
                     file_path=filepath,
                     line_number=line_num,
                     secret_type=f"High Entropy String ({entropy:.2f})",
                     severity=Severity.MEDIUM,
-                    content_snippet=line.strip()
+                    content_snippet=snippet,
+                    span=span,
+                    digest=digest
                 ))
 
     def _calculate_entropy(self, text: str) -> float:
-        if not text:
-            return 0
-        prob = [float(text.count(c)) / len(text) for c in dict.fromkeys(list(text))]
-        return - sum([p * math.log(p) / math.log(2.0) for p in prob])
+        return shannon_entropy(text)
+
+
+# Process pool workers: each worker builds its own scanner once and reuses it
+_worker_scanner = None
+_worker_profile = None
+
+def _init_worker(policy: PolicyEngine, options: Dict):
+    global _worker_scanner, _worker_profile
+    options = dict(options)
+    _worker_profile = options.pop("profile")
+    _worker_scanner = SecretScanner(policy, **options)
+
+def _scan_file_worker(task) -> Tuple[int, Counter, Dict[str, str], int, List[ScanResult], Optional[ScanProfiler]]:
+    """
+    task: a file path, or a (zip path, member index, budget) tuple. Time
+    limits are enforced here, in the worker's main thread.
+    """
+    _worker_scanner._found = []
+    _worker_scanner.files_scanned = 0
+    _worker_scanner.skipped = Counter()
+    _worker_scanner.partial = {}
+    _worker_scanner.suppressed = 0
+    _worker_scanner.profiler = None if _worker_profile is None else ScanProfiler(per_rule=_worker_profile)
+    if isinstance(task, tuple):
+        _worker_scanner._scan_zip_member(*task)
+    else:
+        _worker_scanner._scan_file(task)
+    return (_worker_scanner.files_scanned, _worker_scanner.skipped, _worker_scanner.partial,
+            _worker_scanner.suppressed, _worker_scanner._found, _worker_scanner.profiler)
@@ -0,0 +1,116 @@
+"""
+Local stand-in for the AWS STS and GitHub endpoints used by live
+validation, so the pipeline can be exercised offline:
+
+    python -m security_guardian.stub_server --port 8787 \
+        --aws AKIA...:<secret> --github ghp_...
+    SECURITY_GUARDIAN_STS_ENDPOINT=http://127.0.0.1:8787/sts \
+    SECURITY_GUARDIAN_GITHUB_ENDPOINT=http://127.0.0.1:8787/github \
+        security-guardian scan . --validate-live
+"""
+import argparse
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+
+from .validator import sign_sts_request
+
+_CREDENTIAL = re.compile(r"Credential=([^/]+)/")
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    """
+    Answers STS GetCallerIdentity under /sts (verifying the SigV4 signature
+    against the known secret) and GitHub GET /user under /github. Counts
+    requests and TCP connections so tests can check caching and keep-alive.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, aws_keys: Optional[Dict[str, str]] = None, github_tokens: Iterable[str] = (),
+                 port: int = 0):
+        self.aws_keys = dict(aws_keys or {})
+        self.github_tokens = set(github_tokens)
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        super().__init__(("127.0.0.1", port), _StubHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "StubProviderServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: bytes, content_type: str):
+        with self.server._lock:
+            self.server.requests += 1
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/github/user":
+            return self._reply(404, b'{"message": "Not Found"}', "application/json")
+        token = self.headers.get("Authorization", "").split(" ", 1)[-1]
+        if token in self.server.github_tokens:
+            return self._reply(200, json.dumps({"login": "stub-user"}).encode(), "application/json")
+        return self._reply(401, b'{"message": "Bad credentials"}', "application/json")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/sts/":
+            return self._reply(404, b"", "text/xml")
+        authorization = self.headers.get("Authorization", "")
+        match = _CREDENTIAL.search(authorization)
+        key_id = match.group(1) if match else ""
+        secret = self.server.aws_keys.get(key_id)
+        expected = sign_sts_request(key_id, secret, self.headers.get("Host", ""),
+                                    self.headers.get("X-Amz-Date", "")) if secret else None
+        if b"Action=GetCallerIdentity" in body and authorization == expected:
+            arn = f"arn:aws:iam::123456789012:user/stub-{key_id[-4:].lower()}"
+            return self._reply(200, f"<GetCallerIdentityResponse><GetCallerIdentityResult><Arn>{arn}</Arn>"
+                                    f"</GetCallerIdentityResult></GetCallerIdentityResponse>".encode(), "text/xml")
+        return self._reply(403, b"<ErrorResponse><Error><Code>InvalidClientTokenId</Code></Error></ErrorResponse>",
+                           "text/xml")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the STS and GitHub validation endpoints")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--aws", nargs="*", default=[], metavar="KEY_ID:SECRET", help="Credentials reported as valid")
+    parser.add_argument("--github", nargs="*", default=[], metavar="TOKEN", help="Tokens reported as valid")
+    args = parser.parse_args()
+
+    server = StubProviderServer(dict(pair.split(":", 1) for pair in args.aws), args.github, port=args.port)
+    print(f"[INFO] Stub endpoints: STS {server.url}/sts  GitHub {server.url}/github")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
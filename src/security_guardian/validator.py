@@ -1,3 +1,50 @@
+import asyncio
+import hashlib
+import hmac
+import http.client
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Live endpoints; overridable for tests and air-gapped setups (see stub_server.py)
+DEFAULT_ENDPOINTS = {
+    "aws": "https://sts.amazonaws.com",
+    "github": "https://api.github.com",
+}
+ENDPOINT_ENV = {
+    "aws": "SECURITY_GUARDIAN_STS_ENDPOINT",
+    "github": "SECURITY_GUARDIAN_GITHUB_ENDPOINT",
+}
+
+# Requests per second per provider (GitHub allows 5000 authenticated calls/hour)
+DEFAULT_RATE_LIMITS = {"aws": 10.0, "github": 2.0}
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TTL = 3600.0
+
+AWS_KEY_ID = re.compile(r"(A3T[A-Z0-9]|AKIA|AGPA|AIDA|AROA|AIPA|ANPA|ANVA|ASIA)[A-Z0-9]{16}")
+AWS_SECRET = re.compile(r"(?i)aws_secret_access_key['\"]?\s*(?:=|:)\s*['\"]?([A-Za-z0-9/+=]{40})")
+GITHUB_TOKEN = re.compile(r"(?:ghp|gho|ghu|ghs|ghr)_[A-Za-z0-9_]{36}")
+
+STS_BODY = b"Action=GetCallerIdentity&Version=2011-06-15"
+STS_REGION = "us-east-1"
+
+
+def _rule(secret_type: str) -> str:
+    return secret_type.split(" (", 1)[0]
+
+
+def _status_rank(status: Optional[str]) -> int:
+    for rank, prefix in enumerate(("INVALID", "UNVERIFIED", "VALID"), start=1):
+        if status and status.startswith(prefix):
+            return rank
+    return 0
+
+
 class SecretValidator:
     """
     Simulates checking if a secret is actually live against a cloud provider.
@@ -18,3 +65,326 @@ class SecretValidator:
             return "UNVERIFIED: GitHub token validation requires API access."
             
         return "N/A"
+
+
+def sign_sts_request(key_id: str, secret: str, host: str, amz_date: str) -> str:
+    """AWS Signature Version 4 Authorization header for STS GetCallerIdentity."""
+    date = amz_date[:8]
+    signed_headers = "content-type;host;x-amz-date"
+    canonical_request = "\n".join([
+        "POST", "/", "",
+        "content-type:application/x-www-form-urlencoded; charset=utf-8",
+        f"host:{host}",
+        f"x-amz-date:{amz_date}",
+        "",
+        signed_headers,
+        hashlib.sha256(STS_BODY).hexdigest(),
+    ])
+    scope = f"{date}/{STS_REGION}/sts/aws4_request"
+    string_to_sign = "\n".join([
+        "AWS4-HMAC-SHA256", amz_date, scope,
+        hashlib.sha256(canonical_request.encode("utf-8")).hexdigest(),
+    ])
+    key = ("AWS4" + secret).encode("utf-8")
+    for part in (date, STS_REGION, "sts", "aws4_request"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    return f"AWS4-HMAC-SHA256 Credential={key_id}/{scope}, SignedHeaders={signed_headers}, Signature={signature}"
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections to one endpoint, shared by the validation
+    threads. A reused connection the server has closed is retried once on a
+    fresh one.
+    """
+
+    def __init__(self, endpoint: str, size: int, timeout: float):
+        parts = urlsplit(endpoint)
+        self.host = parts.netloc
+        self.secure = parts.scheme == "https"
+        self.base_path = parts.path.rstrip("/")
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+        return cls(self.host, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        """Blocking request; returns (status, body)."""
+        headers = dict(headers or {}, Host=self.host)
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        reused = conn is not None
+        while True:
+            if conn is None:
+                conn = self._new_connection()
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = None, False
+                continue
+            break
+
+        with self._lock:
+            if response.will_close or len(self._idle) >= self.size:
+                conn.close()
+            else:
+                self._idle.append(conn)
+        return response.status, data
+
+    def close(self):
+        with self._lock:
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+
+
+class RateLimiter:
+    """Spaces out calls to at most `rate` per second (async, FIFO)."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AsyncValidator:
+    """
+    Live verification against the provider APIs (AWS STS GetCallerIdentity,
+    GitHub GET /user) with bounded concurrency, per-provider rate limits and
+    pooled keep-alive connections. Results are cached for `ttl` seconds,
+    keyed by a hash of the secret (the secret itself is never stored), and
+    concurrent checks of the same secret share one request. Transient
+    failures (network errors, throttling, 5xx) are reported as UNVERIFIED
+    and not cached.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, ttl: float = DEFAULT_TTL,
+                 rate_limits: Optional[Dict[str, float]] = None,
+                 endpoints: Optional[Dict[str, str]] = None, timeout: float = 10.0):
+        self.concurrency = max(1, concurrency)
+        self.ttl = ttl
+        rates = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self.limiters = {provider: RateLimiter(rate) for provider, rate in rates.items()}
+        self.endpoints = {
+            provider: (endpoints or {}).get(provider) or os.environ.get(ENDPOINT_ENV[provider]) or url
+            for provider, url in DEFAULT_ENDPOINTS.items()
+        }
+        self.pools = {
+            provider: ConnectionPool(url, self.concurrency, timeout) for provider, url in self.endpoints.items()
+        }
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="validate")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: Dict[str, Tuple[float, str]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.requests = 0
+
+    async def validate_github(self, token: str) -> str:
+        return await self._cached("github", token, lambda: self._github(token))
+
+    async def validate_aws(self, key_id: str, secret: str) -> str:
+        return await self._cached("aws", f"{key_id}:{secret}", lambda: self._aws(key_id, secret))
+
+    async def _cached(self, provider: str, secret: str, check) -> str:
+        key = hashlib.sha256(f"{provider}:{secret}".encode("utf-8")).hexdigest()
+        hit = self._cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            return hit[1]
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        task = asyncio.ensure_future(self._limited(provider, check))
+        self._inflight[key] = task
+        try:
+            status = await task
+        finally:
+            self._inflight.pop(key, None)
+        if not status.startswith("UNVERIFIED"):
+            self._cache[key] = (time.monotonic() + self.ttl, status)
+        return status
+
+    async def _limited(self, provider: str, check) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            await self.limiters[provider].acquire()
+            try:
+                return await check()
+            except (OSError, http.client.HTTPException) as e:
+                return f"UNVERIFIED: {provider} endpoint unreachable ({e.__class__.__name__})."
+
+    async def _request(self, provider: str, method: str, path: str, body=None, headers=None) -> Tuple[int, bytes]:
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.pools[provider].request, method, path, body, headers
+        )
+
+    async def _github(self, token: str) -> str:
+        status, body = await self._request("github", "GET", "/user", headers={
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "security-guardian",
+        })
+        if status == 200:
+            try:
+                login = json.loads(body).get("login", "?")
+            except ValueError:
+                login = "?"
+            return f"VALID: Active GitHub token for user '{login}'."
+        if status == 401:
+            return "INVALID: GitHub rejected the token (revoked or expired)."
+        return f"UNVERIFIED: GitHub API answered HTTP {status}."
+
+    async def _aws(self, key_id: str, secret: str) -> str:
+        pool = self.pools["aws"]
+        amz_date = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        status, body = await self._request("aws", "POST", "/", body=STS_BODY, headers={
+            "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+            "X-Amz-Date": amz_date,
+            "Authorization": sign_sts_request(key_id, secret, pool.host, amz_date),
+        })
+        if status == 200:
+            arn = re.search(rb"<Arn>([^<]+)</Arn>", body)
+            return f"VALID: Active AWS credentials for {arn.group(1).decode('utf-8', 'replace') if arn else key_id}."
+        if status in (401, 403) and b"Throttl" not in body:
+            return "INVALID: AWS STS rejected the credentials."
+        return f"UNVERIFIED: AWS STS answered HTTP {status}."
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        for pool in self.pools.values():
+            pool.close()
+
+
+class ValidationPipeline:
+    """
+    Runs an AsyncValidator on a background event loop so that findings are
+    verified while the scan is still producing them. submit() returns a
+    Future with the validation status.
+
+    AWS key IDs can only be verified together with their secret access key,
+    so AWS findings are paired per file: they resolve once the scan moves
+    on to the next file (or flush() is called).
+    """
+
+    def __init__(self, validator: AsyncValidator):
+        self.validator = validator
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="validation-loop", daemon=True)
+        self._thread.start()
+        self._aws_file: Optional[str] = None
+        self._aws_ids: List[Tuple[str, Future]] = []
+        self._aws_secrets: List[Tuple[str, Future]] = []
+
+    @staticmethod
+    def _done(status: str) -> Future:
+        future: Future = Future()
+        future.set_result(status)
+        return future
+
+    def submit(self, file_path: str, secret_type: str, content: str) -> Future:
+        if file_path != self._aws_file:
+            self.flush()
+            self._aws_file = file_path
+
+        rule = _rule(secret_type)
+        if rule == "GitHub Token":
+            match = GITHUB_TOKEN.search(content)
+            if match is None:
+                return self._done("UNVERIFIED: Token not found in snippet.")
+            return asyncio.run_coroutine_threadsafe(self.validator.validate_github(match.group(0)), self._loop)
+
+        if rule in ("AWS Access Key", "AWS Secret Key"):
+            if "EXAMPLE" in content:
+                return self._done("TEST_KEY: This appears to be a documentation example.")
+            pattern, pending = (AWS_KEY_ID, self._aws_ids) if rule == "AWS Access Key" else (AWS_SECRET, self._aws_secrets)
+            match = pattern.search(content)
+            if match is None:
+                return self._done("UNVERIFIED: Credential not found in snippet.")
+            future: Future = Future()
+            pending.append((match.group(0) if pattern is AWS_KEY_ID else match.group(1), future))
+            return future
+
+        return self._done("N/A")
+
+    def flush(self):
+        """Resolves the AWS findings of the current file."""
+        ids, secrets = self._aws_ids, self._aws_secrets
+        self._aws_ids, self._aws_secrets = [], []
+        if not ids and not secrets:
+            return
+        if not secrets:
+            for _, future in ids:
+                future.set_result("UNVERIFIED: No secret access key in the same file.")
+            return
+        if not ids:
+            for _, future in secrets:
+                future.set_result("UNVERIFIED: No access key ID in the same file.")
+            return
+        group = asyncio.run_coroutine_threadsafe(self._validate_aws_group(ids, secrets), self._loop)
+        group.add_done_callback(lambda done: self._resolve_group(done, ids + secrets))
+
+    async def _validate_aws_group(self, ids, secrets) -> Dict[int, str]:
+        """
+        Tries each key ID against each secret of the file. Every finding
+        gets its best outcome: VALID, then UNVERIFIED (can't rule it out),
+        then INVALID. The pairs are checked concurrently, within the
+        validator's concurrency and rate limits.
+        """
+        pairs = [(i, j) for i in range(len(ids)) for j in range(len(secrets))]
+        results = await asyncio.gather(
+            *(self.validator.validate_aws(ids[i][0], secrets[j][0]) for i, j in pairs)
+        )
+        statuses: Dict[int, str] = {}
+        for (i, j), status in zip(pairs, results):
+            for index in (i, len(ids) + j):
+                if _status_rank(status) > _status_rank(statuses.get(index)):
+                    statuses[index] = status
+        return statuses
+
+    @staticmethod
+    def _resolve_group(done: Future, members):
+        error = "UNVERIFIED: Validation failed."
+        try:
+            statuses = done.result()
+        except Exception as e:  # keep the scan going whatever happens
+            statuses = {}
+            error = f"UNVERIFIED: Validation failed ({e.__class__.__name__})."
+        for index, (_, future) in enumerate(members):
+            future.set_result(statuses.get(index) or error)
+
+    async def _drain(self):
+        current = asyncio.current_task()
+        await asyncio.gather(*[t for t in asyncio.all_tasks() if t is not current], return_exceptions=True)
+
+    def close(self):
+        """Resolves the remaining findings, then stops the loop."""
+        self.flush()
+        asyncio.run_coroutine_threadsafe(self._drain(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self.validator.close()